@@ -1,14 +1,34 @@
-from passlib.context import CryptContext
+import hashlib
 import os
-from jose import jwt
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from jose import jwt, ExpiredSignatureError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from .models import Users
+from .database import async_db_session, sessionLocal
+from .models import Users, RevokedTokens
+from .util import bulk_create_new_items
+from . import passwords
+from .metrics import password_seconds, timed
 from dotenv import load_dotenv
 
 load_dotenv()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+LOGIN_CONCURRENCY = int(os.getenv("LOGIN_CONCURRENCY", "8"))
+LOGIN_QUEUE_TIMEOUT = float(os.getenv("LOGIN_QUEUE_TIMEOUT", "5"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "300"))
+ACCESS_TOKEN_MINUTES = float(os.getenv("ACCESS_TOKEN_MINUTES", "15"))
+REFRESH_TOKEN_DAYS = float(os.getenv("REFRESH_TOKEN_DAYS", "30"))
+REVOCATION_CHECK_SECONDS = float(os.getenv("REVOCATION_CHECK_SECONDS", "5"))
+login_slots = threading.BoundedSemaphore(LOGIN_CONCURRENCY)
 oauth_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
@@ -16,11 +36,44 @@ class HashVerifyPassword:
 
     @staticmethod
     def hash_password(password: str) -> str:
-        return pwd_context.hash(secret=password)
+        start = time.perf_counter()
+        try:
+            return passwords.run_in_password_pool(passwords.hash_password, password)
+        finally:
+            password_seconds.observe(time.perf_counter() - start, "hash")
 
     @staticmethod
     def verify_password(password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(secret=password, hash=hashed_password)
+        valid, _ = HashVerifyPassword.verify_and_update_password(
+            password, hashed_password
+        )
+        return valid
+
+    @staticmethod
+    def verify_and_update_password(
+        password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        start = time.perf_counter()
+        try:
+            return passwords.run_in_password_pool(
+                passwords.verify_and_update_password, password, hashed_password
+            )
+        finally:
+            password_seconds.observe(time.perf_counter() - start, "verify")
+
+
+@contextmanager
+def login_slot():
+    if not login_slots.acquire(timeout=LOGIN_QUEUE_TIMEOUT):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"message": "Too many login attempts in progress, try again."},
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        login_slots.release()
 
 
 class JWT:
@@ -35,6 +88,8 @@ class JWT:
     def jwt_decode(self, token: str) -> dict:
         try:
             payload = jwt.decode(token, self.SECRET, [self.ALGORITHM])
+        except ExpiredSignatureError:
+            raise invalid_token_error("The token has expired.")
         except Exception as error:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -44,6 +99,195 @@ class JWT:
             return payload
 
 
+class TokenCache:
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def token_digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self.token_digest(token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return payload
+
+    def set(self, token: str, payload: dict) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if isinstance(payload.get("exp"), (int, float)):
+            expires_at = min(expires_at, payload["exp"])
+        if expires_at <= time.time():
+            return
+        key = self.token_digest(token)
+        with self.lock:
+            self.entries[key] = (expires_at, payload)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class RevocationStore:
+    def __init__(self, check_seconds: float):
+        self.check_seconds = check_seconds
+        self.revoked: dict[str, float] = {}
+        self.checked: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def remember(self, jti: str, expires_at: float) -> None:
+        now = time.time()
+        with self.lock:
+            self.revoked[jti] = expires_at
+            self.checked.pop(jti, None)
+            if len(self.revoked) > 10000:
+                self.revoked = {
+                    jti: expires_at
+                    for jti, expires_at in self.revoked.items()
+                    if expires_at > now
+                }
+
+    def remember_checked(self, jti: str) -> None:
+        now = time.time()
+        with self.lock:
+            self.checked[jti] = now + self.check_seconds
+            if len(self.checked) > 10000:
+                self.checked = {
+                    jti: checked_until
+                    for jti, checked_until in self.checked.items()
+                    if checked_until > now
+                }
+
+    def cached(self, jti: str) -> bool | None:
+        with self.lock:
+            if jti in self.revoked:
+                return True
+            if self.checked.get(jti, 0) > time.time():
+                return False
+        return None
+
+    def found(self, jti: str, expires_at: datetime | None) -> bool:
+        if expires_at is None:
+            if self.check_seconds > 0:
+                self.remember_checked(jti)
+            return False
+        self.remember(jti, expires_at.replace(tzinfo=timezone.utc).timestamp())
+        return True
+
+    def lookup(self, jti: str, db: Session) -> bool:
+        expires_at = db.scalar(
+            select(RevokedTokens.expires_at).where(RevokedTokens.jti == jti)
+        )
+        return self.found(jti, expires_at)
+
+    async def async_lookup(self, jti: str, db: AsyncSession) -> bool:
+        expires_at = await db.scalar(
+            select(RevokedTokens.expires_at).where(RevokedTokens.jti == jti)
+        )
+        return self.found(jti, expires_at)
+
+    def is_revoked(self, jti: str | None, db: Session | None = None) -> bool:
+        if jti is None:
+            return False
+        if db is not None:
+            with self.lock:
+                if jti in self.revoked:
+                    return True
+            return self.lookup(jti, db)
+        revoked = self.cached(jti)
+        if revoked is not None:
+            return revoked
+        with sessionLocal() as session:
+            return self.lookup(jti, session)
+
+    async def async_is_revoked(self, jti: str | None, db: AsyncSession) -> bool:
+        if jti is None:
+            return False
+        revoked = self.cached(jti)
+        if revoked is not None:
+            return revoked
+        return await self.async_lookup(jti, db)
+
+    def revoke(self, jti: str, expires_at: float, db: Session) -> bool:
+        self.remember(jti, expires_at)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        db.query(RevokedTokens).filter(RevokedTokens.expires_at < now).delete()
+        revoked_token = {
+            "jti": jti,
+            "expires_at": datetime.fromtimestamp(expires_at, timezone.utc).replace(
+                tzinfo=None
+            ),
+        }
+        created = bulk_create_new_items(
+            [revoked_token], db, RevokedTokens, [RevokedTokens.id]
+        )
+        return bool(created)
+
+
+jwt_obj = JWT()
+token_cache = TokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+revocation_store = RevocationStore(REVOCATION_CHECK_SECONDS)
+
+
+def invalid_token_error(message: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail={"message": message},
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def issue_tokens(user: Users) -> dict:
+    now = int(time.time())
+    access_expires_at = now + int(ACCESS_TOKEN_MINUTES * 60)
+    refresh_expires_at = now + int(REFRESH_TOKEN_DAYS * 24 * 60 * 60)
+    access_payload = {
+        "id": user.id,
+        "role": user.role,
+        "type": "access",
+        "jti": uuid.uuid4().hex,
+        "exp": access_expires_at,
+    }
+    refresh_payload = {
+        "id": user.id,
+        "type": "refresh",
+        "jti": uuid.uuid4().hex,
+        "exp": refresh_expires_at,
+    }
+    return {
+        "access_token": jwt_obj.jwt_encode(payload=access_payload),
+        "token_type": "bearer",
+        "expires_in": access_expires_at - now,
+        "refresh_token": jwt_obj.jwt_encode(payload=refresh_payload),
+    }
+
+
+@timed("auth")
+def verify_refresh_token(refresh_token: str, db: Session) -> dict:
+    payload = jwt_obj.jwt_decode(token=refresh_token)
+    if payload.get("type") != "refresh" or not payload.get("jti"):
+        raise invalid_token_error("The refresh token is invalid.")
+    if revocation_store.is_revoked(payload.get("jti"), db):
+        raise invalid_token_error("The refresh token has been revoked.")
+    return payload
+
+
+@timed("auth")
 def verify_user(email: str, password: str, db: Session) -> Users:
     user = db.query(Users).filter(Users.email == email).first()
     if not user:
@@ -53,23 +297,51 @@ def verify_user(email: str, password: str, db: Session) -> Users:
             headers={"WWW-Authenticate": "Bearer"},
         )
     hashed_password = user.password
-    if not HashVerifyPassword().verify_password(
+    valid, new_hashed_password = HashVerifyPassword().verify_and_update_password(
         password=password, hashed_password=hashed_password
-    ):
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={"message": "Invalid credentials, check the username and password."},
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hashed_password:
+        user.password = new_hashed_password
+        db.commit()
     return user
 
 
-def get_current_user(token: str = Depends(oauth_scheme)) -> dict:
-    payload = JWT().jwt_decode(token=token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={"message": "Invalid credentials, check the username and password."},
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+def access_token_payload(token: str) -> dict:
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt_obj.jwt_decode(token=token)
+        if not payload or payload.get("type") != "access":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail={
+                    "message": "Invalid credentials, check the username and password."
+                },
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        token_cache.set(token, payload)
     return payload
+
+
+@timed("auth")
+def get_current_user(token: str = Depends(oauth_scheme)) -> dict:
+    payload = access_token_payload(token)
+    if revocation_store.is_revoked(payload.get("jti")):
+        raise invalid_token_error("The access token has been revoked.")
+    return dict(payload)
+
+
+async def async_get_current_user(
+    token: str = Depends(oauth_scheme),
+    db: AsyncSession = Depends(async_db_session),
+) -> dict:
+    with timed("auth"):
+        payload = access_token_payload(token)
+        if await revocation_store.async_is_revoked(payload.get("jti"), db):
+            raise invalid_token_error("The access token has been revoked.")
+    return dict(payload)
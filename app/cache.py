@@ -0,0 +1,281 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .models import AssignUserTask, Projects, TaskProgressInfo, Tasks
+from .schemas import ProjectOut, TaskOut
+from .util import async_get_item_by_id, get_item_by_id, raise_item_not_found
+from .etags import etag_matches, item_etag
+from .serializers import dump_json
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None: ...
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+
+class NoCache(CacheBackend):
+    def get(self, key: str) -> bytes | None:
+        return None
+
+    def set(self, key: str, value: bytes) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class LocalCache(CacheBackend):
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+class LocalSharedCacheClient:
+    def __init__(self):
+        self.values: dict[str, tuple[float, bytes]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None or entry[0] <= time.time():
+                self.values.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ex: int) -> None:
+        with self.lock:
+            self.values[key] = (time.time() + ex, value)
+
+    def delete(self, *keys: str) -> int:
+        with self.lock:
+            return sum(self.values.pop(key, None) is not None for key in keys)
+
+    def flushdb(self) -> None:
+        with self.lock:
+            self.values.clear()
+
+
+class SharedCache(CacheBackend):
+    def __init__(self, client, ttl: float, prefix: str = "pm:"):
+        self.client = client
+        self.ttl = max(int(ttl), 1)
+        self.prefix = prefix
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self) -> None:
+        self.client.flushdb()
+
+
+def build_cache_backend(name: str) -> CacheBackend:
+    if name == "none" or CACHE_TTL <= 0:
+        return NoCache()
+    if name == "shared":
+        return SharedCache(LocalSharedCacheClient(), CACHE_TTL)
+    return LocalCache(CACHE_MAX_ENTRIES, CACHE_TTL)
+
+
+entity_cache = build_cache_backend(CACHE_BACKEND)
+no_cache = NoCache()
+cached_schemas = {Projects: (ProjectOut,), Tasks: (TaskOut,)}
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    global entity_cache
+    entity_cache = backend
+
+
+def cache_key(Model, id: int, schema) -> str:
+    return f"{Model.__tablename__}:{id}:{schema.__name__}"
+
+
+def pack_entry(version: int, content: bytes) -> bytes:
+    return b"%d:" % version + content
+
+
+def unpack_entry(entry: bytes) -> tuple[int, bytes]:
+    version, _, content = entry.partition(b":")
+    return int(version), content
+
+
+def get_item_version(id: int, db: Session, Model, item_name: str = "item") -> int:
+    version = db.query(Model.version).filter(Model.id == id).scalar()
+    if version is None:
+        raise_item_not_found(id, item_name)
+    return version
+
+
+async def async_get_item_version(
+    id: int, db: AsyncSession, Model, item_name: str = "item"
+) -> int:
+    version = await db.scalar(select(Model.version).where(Model.id == id))
+    if version is None:
+        raise_item_not_found(id, item_name)
+    return version
+
+
+def get_cached_item_by_id(
+    id: int,
+    db: Session,
+    Model,
+    item_name: str = "item",
+    schema=None,
+    if_none_match: str | None = None,
+) -> tuple[str, bytes | None]:
+    key = cache_key(Model, id, schema)
+    cache = entity_cache if schema in cached_schemas.get(Model, ()) else no_cache
+    entry = cache.get(key)
+    if entry is not None:
+        version, content = unpack_entry(entry)
+        return item_etag(Model, id, version, schema), content
+    if if_none_match:
+        etag = item_etag(Model, id, get_item_version(id, db, Model, item_name), schema)
+        if etag_matches(if_none_match, etag):
+            return etag, None
+    item = get_item_by_id(id, db, Model, item_name, schema)
+    content = dump_json(item, schema)
+    cache.set(key, pack_entry(item.version, content))
+    return item_etag(Model, id, item.version, schema), content
+
+
+async def async_get_cached_item_by_id(
+    id: int,
+    db: AsyncSession,
+    Model,
+    item_name: str = "item",
+    schema=None,
+    if_none_match: str | None = None,
+) -> tuple[str, bytes | None]:
+    key = cache_key(Model, id, schema)
+    cache = entity_cache if schema in cached_schemas.get(Model, ()) else no_cache
+    entry = cache.get(key)
+    if entry is not None:
+        version, content = unpack_entry(entry)
+        return item_etag(Model, id, version, schema), content
+    if if_none_match:
+        version = await async_get_item_version(id, db, Model, item_name)
+        etag = item_etag(Model, id, version, schema)
+        if etag_matches(if_none_match, etag):
+            return etag, None
+    item = await async_get_item_by_id(id, db, Model, item_name, schema)
+    content = dump_json(item, schema)
+    cache.set(key, pack_entry(item.version, content))
+    return item_etag(Model, id, item.version, schema), content
+
+
+def entity_keys(Model, *ids: int) -> list[str]:
+    return [
+        cache_key(Model, id, schema)
+        for id in ids
+        for schema in cached_schemas.get(Model, ())
+    ]
+
+
+def task_keys(task_id: int, project_id: int) -> list[str]:
+    return entity_keys(Tasks, task_id) + entity_keys(Projects, project_id)
+
+
+def project_keys(db: Session, project_id: int) -> list[str]:
+    task_ids = [
+        task_id
+        for (task_id,) in db.query(Tasks.id).filter(Tasks.project_id == project_id)
+    ]
+    return entity_keys(Tasks, *task_ids) + entity_keys(Projects, project_id)
+
+
+def user_related_ids(db: Session, user_id: int) -> tuple[set[int], set[int]]:
+    tasks = (
+        db.query(Tasks.id, Tasks.project_id)
+        .join(Projects, Projects.id == Tasks.project_id)
+        .filter(
+            Tasks.id.in_(
+                db.query(AssignUserTask.task_id).filter(
+                    AssignUserTask.user_id == user_id
+                )
+            )
+            | Tasks.id.in_(
+                db.query(TaskProgressInfo.task_id).filter(
+                    TaskProgressInfo.user_id == user_id
+                )
+            )
+            | (Projects.admin_id == user_id)
+        )
+        .all()
+    )
+    project_ids = {
+        project_id
+        for (project_id,) in db.query(Projects.id).filter(Projects.admin_id == user_id)
+    }
+    project_ids.update(task.project_id for task in tasks)
+    return {task.id for task in tasks}, project_ids
+
+
+def related_keys(task_ids: set[int], project_ids: set[int]) -> list[str]:
+    return entity_keys(Tasks, *task_ids) + entity_keys(Projects, *project_ids)
+
+
+def invalidate(keys: list[str]) -> None:
+    entity_cache.delete(*keys)
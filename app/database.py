@@ -1,14 +1,134 @@
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
 URL = os.getenv("DB_URL")
-engine = create_engine(url=URL)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+
+class TimedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except TimeoutError:
+            self.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.record_wait(time.perf_counter() - start)
+        return connection
+
+    def record_wait(self, waited: float, timed_out: bool = False):
+        with self.stats_lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, poolclass) -> dict:
+    url = make_url(url)
+    if url.get_backend_name() != "postgresql":
+        return {}
+    options = {
+        "poolclass": poolclass,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": POOL_PRE_PING,
+        "pool_timeout": POOL_TIMEOUT,
+    }
+    if STATEMENT_TIMEOUT_MS:
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"
+            }
+    return options
+
+
+def pool_statistics(engine) -> dict | None:
+    if engine is None:
+        return None
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"status": pool.status()}
+    statistics = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    if isinstance(pool, TimedPoolMixin):
+        with pool.stats_lock:
+            statistics.update(
+                {
+                    "checkouts": pool.checkouts,
+                    "checkout_timeouts": pool.timeouts,
+                    "wait_seconds_total": round(pool.wait_seconds_total, 6),
+                    "wait_seconds_max": round(pool.wait_seconds_max, 6),
+                }
+            )
+    return statistics
+
+
+def async_url(url: str) -> str:
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    elif url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+engine = create_engine(url=URL, **engine_options(URL, TimedQueuePool))
 sessionLocal = sessionmaker(autoflush=False, autocommit=False, bind=engine)
 
+ASYNC_DB = os.getenv("DB_ASYNC", "false").lower() == "true"
+ASYNC_URL = os.getenv("ASYNC_DB_URL") or async_url(URL)
+async_engine = (
+    create_async_engine(url=ASYNC_URL, **engine_options(ASYNC_URL, TimedAsyncQueuePool))
+    if ASYNC_DB
+    else None
+)
+asyncSessionLocal = async_sessionmaker(
+    autoflush=False, expire_on_commit=False, bind=async_engine
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -20,3 +140,8 @@ def db_session():
         yield session
     finally:
         session.close()
+
+
+async def async_db_session():
+    async with asyncSessionLocal() as session:
+        yield session
@@ -0,0 +1,90 @@
+from fastapi import Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .fieldsets import schema_variant
+from .models import Projects, Tasks
+from .util import page_version_statement
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def variant_suffix(schema) -> str:
+    variant = schema_variant(schema)
+    return f".{variant}" if variant else ""
+
+
+def item_etag(Model, id: int, version: int, schema=None) -> str:
+    return f'"{Model.__tablename__}.{id}.{version}{variant_suffix(schema)}"'
+
+
+def page_etag(
+    Model, count: int, max_id: int | None, version_total: int, schema=None
+) -> str:
+    return (
+        f'"{Model.__tablename__}.{count}.{max_id or 0}.{version_total}'
+        f'{variant_suffix(schema)}"'
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
+
+
+def conditional_response(
+    content: bytes | None, etag: str, if_none_match: str | None
+) -> Response:
+    if content is None or etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response = Response(content=content, media_type="application/json")
+    set_etag(response, etag)
+    return response
+
+
+def get_page_etag(
+    db: Session,
+    Model,
+    limit: int,
+    cursor: str | None = None,
+    filters: list | None = None,
+    schema=None,
+) -> str:
+    statement = page_version_statement(Model, limit, cursor, filters)
+    return page_etag(Model, *db.execute(statement).one(), schema=schema)
+
+
+async def async_get_page_etag(
+    db: AsyncSession,
+    Model,
+    limit: int,
+    cursor: str | None = None,
+    filters: list | None = None,
+    schema=None,
+) -> str:
+    statement = page_version_statement(Model, limit, cursor, filters)
+    return page_etag(Model, *(await db.execute(statement)).one(), schema=schema)
+
+
+def bump_versions(db: Session, task_ids=(), project_ids=()) -> None:
+    for Model, ids in ((Tasks, task_ids), (Projects, project_ids)):
+        ids = set(ids)
+        if not ids:
+            continue
+        db.query(Model).filter(Model.id.in_(ids)).update(
+            {Model.version: Model.version + 1}, synchronize_session=False
+        )
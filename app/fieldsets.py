@@ -0,0 +1,92 @@
+import hashlib
+from functools import lru_cache
+from typing import get_origin
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, create_model
+from .loaders import nested_schema
+
+
+def schema_variant(schema: type[BaseModel] | None) -> str:
+    return getattr(schema, "__variant__", "")
+
+
+def split_names(value: str | None) -> tuple[str, ...] | None:
+    if value is None:
+        return None
+    return tuple(sorted({name.strip() for name in value.split(",") if name.strip()}))
+
+
+def relationship_fields(schema: type[BaseModel]) -> dict:
+    relationships = {}
+    for name, field in schema.model_fields.items():
+        child_schema = nested_schema(field.annotation)
+        if child_schema:
+            relationships[name] = child_schema
+    return relationships
+
+
+@lru_cache(maxsize=1024)
+def fieldset_schema(
+    schema: type[BaseModel],
+    fields: tuple[str, ...] | None = None,
+    expand: tuple[str, ...] = (),
+) -> type[BaseModel]:
+    relationships = relationship_fields(schema)
+    expanded = {}
+    for path in expand:
+        name, _, rest = path.partition(".")
+        if name not in relationships:
+            raise ValueError(
+                f"'{name}' cannot be expanded, use one of: {', '.join(relationships)}."
+            )
+        expanded.setdefault(name, [])
+        if rest:
+            expanded[name].append(rest)
+    scalars = [name for name in schema.model_fields if name not in relationships]
+    for name in fields or ():
+        if name not in scalars:
+            raise ValueError(
+                f"'{name}' is not a field, use one of: {', '.join(scalars)}."
+            )
+    definitions = {}
+    for name, field in schema.model_fields.items():
+        if name in expanded:
+            child_schema = fieldset_schema(
+                relationships[name], None, tuple(sorted(expanded[name]))
+            )
+            if get_origin(field.annotation) is list:
+                definitions[name] = (list[child_schema], ...)
+            else:
+                definitions[name] = (child_schema, ...)
+        elif name in scalars and (fields is None or name in fields):
+            definitions[name] = (field.annotation, field)
+    model = create_model(schema.__name__, **definitions)
+    key = f"fields={','.join(fields or ())};expand={','.join(expand)}"
+    model.__variant__ = hashlib.sha256(key.encode()).hexdigest()[:12]
+    return model
+
+
+def fieldset(schema: type[BaseModel]):
+    def response_schema(
+        fields: str | None = Query(
+            default=None,
+            description="Comma-separated fields to return, e.g. `id,name,status`. Nested lists are left out unless they are named in `expand`.",
+        ),
+        expand: str | None = Query(
+            default=None,
+            description="Comma-separated nested lists to include, e.g. `project_tasks`. Use dots to go deeper, e.g. `project_tasks.assigned_users.user`.",
+        ),
+    ) -> type[BaseModel]:
+        if fields is None and expand is None:
+            return schema
+        try:
+            return fieldset_schema(
+                schema, split_names(fields) or None, split_names(expand) or ()
+            )
+        except ValueError as error:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"message": str(error)},
+            )
+
+    return response_schema
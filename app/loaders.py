@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import get_args
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import configure_mappers, joinedload, selectinload
+
+
+def nested_schema(annotation) -> type[BaseModel] | None:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        schema = nested_schema(arg)
+        if schema:
+            return schema
+    return None
+
+
+def relationship_loaders(Model, schema: type[BaseModel], parent=None) -> list:
+    loaders = []
+    relationships = inspect(Model).relationships
+    for name, field in schema.model_fields.items():
+        if name not in relationships:
+            continue
+        relationship = relationships[name]
+        attribute = getattr(Model, name)
+        if relationship.uselist:
+            loader = (
+                parent.selectinload(attribute) if parent else selectinload(attribute)
+            )
+        else:
+            loader = parent.joinedload(attribute) if parent else joinedload(attribute)
+        loaders.append(loader)
+        child_schema = nested_schema(field.annotation)
+        if child_schema:
+            loaders.extend(
+                relationship_loaders(relationship.mapper.class_, child_schema, loader)
+            )
+    return loaders
+
+
+@lru_cache(maxsize=1024)
+def eager_load_options(Model, schema: type[BaseModel]) -> tuple:
+    configure_mappers()
+    return tuple(relationship_loaders(Model, schema))
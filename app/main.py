@@ -1,24 +1,73 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from pathlib import Path
+from fastapi import FastAPI, Header, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
-from .util import home_page
+from .util import home_page_content
 from .routers import auth, projects, users, tasks, assign_task, task_progress
-from .database import Base, engine
+from .routers import admin, async_reads, export, search, deadlines, metrics
+from .database import ASYNC_DB, engine, async_engine
+from .etags import etag_matches
+from .metrics import METRICS_ENABLED, MetricsMiddleware
+from .passwords import shutdown_password_executor
+from .querybudget import recording_enabled
+from dotenv import load_dotenv
+import os
 
+load_dotenv()
 
-Base.metadata.create_all(engine)
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "false").lower() == "true"
+HOME_CACHE_CONTROL = f"public, max-age={int(os.getenv('HOME_CACHE_SECONDS', '3600'))}"
+
+description = (Path(__file__).parent / "description.txt").read_text()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MIGRATE_ON_STARTUP:
+        from .migrate import upgrade_database
+
+        await run_in_threadpool(upgrade_database)
+    home_page_content()
+    yield
+    await run_in_threadpool(shutdown_password_executor)
+    engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
 
-with open("./app/description.txt", "r") as f:
-    description = f.read()
 
 app = FastAPI(
     description=description,
     summary="The Project Management API facilitates efficient project management by allowing task assignment, setting deadlines, and tracking progress. It supports role-based access with specific permissions for Admins, Users, and Guests, ensuring secure and effective collaboration within teams.",
+    lifespan=lifespan,
 )
 
 
-@app.get("/", tags=["Home"], description="This is the home page.")
-def root():
-    return HTMLResponse(home_page())
+@app.get(
+    "/",
+    tags=["Home"],
+    response_class=HTMLResponse,
+    description="This is the home page.",
+)
+def root(
+    accept_encoding: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+):
+    content, compressed, etag = home_page_content()
+    gzipped = bool(accept_encoding and "gzip" in accept_encoding)
+    if gzipped:
+        etag = etag[:-1] + '-gzip"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": HOME_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        content = compressed
+    return HTMLResponse(content, headers=headers)
 
 
 all_routers = [
@@ -28,7 +77,20 @@ all_routers = [
     tasks.router,
     assign_task.router,
     task_progress.router,
+    admin.router,
+    export.router,
+    search.router,
+    deadlines.router,
 ]
 
+if ASYNC_DB:
+    app.include_router(async_reads.router)
+
+if METRICS_ENABLED or recording_enabled():
+    app.add_middleware(MetricsMiddleware)
+
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
+
 for router in all_routers:
     app.include_router(router)
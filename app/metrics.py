@@ -0,0 +1,282 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .database import async_engine, engine, pool_statistics
+from .querybudget import check_budget, recording_enabled, statement_origin
+from dotenv import load_dotenv
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500)
+PASSWORD_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+TIMED_PHASES = ("auth", "serialize")
+
+
+class RequestStats:
+    def __init__(self, scope: dict | None = None):
+        self.scope = scope or {}
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.seconds = {"db": 0.0}
+        self.statements = [] if recording_enabled() else None
+
+    def server_timing(self) -> str:
+        total = time.perf_counter() - self.start
+        entries = [
+            f'db;dur={self.seconds["db"] * 1000:.1f};desc="{self.queries} queries"'
+        ]
+        for phase in TIMED_PHASES:
+            if phase in self.seconds:
+                entries.append(f"{phase};dur={self.seconds[phase] * 1000:.1f}")
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+    def endpoint_name(self) -> str | None:
+        return getattr(self.scope.get("endpoint"), "__name__", None)
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+@contextmanager
+def timed(phase: str):
+    stats = request_stats.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            elapsed = time.perf_counter() - start
+            stats.seconds[phase] = stats.seconds.get(phase, 0.0) + elapsed
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds["db"] += elapsed
+        if stats.statements is not None:
+            origin = statement_origin(stats.endpoint_name())
+            stats.statements.append((statement, elapsed, origin))
+
+
+def handle_error(context):
+    if context.connection is not None:
+        query_start = context.connection.info.get("query_start")
+        if query_start:
+            query_start.pop()
+
+
+STATEMENT_LISTENERS = {
+    "before_cursor_execute": before_cursor_execute,
+    "after_cursor_execute": after_cursor_execute,
+    "handle_error": handle_error,
+}
+
+
+def instrument_engine(target: Engine) -> None:
+    for name, listener in STATEMENT_LISTENERS.items():
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener)
+
+
+def label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def label_text(names: tuple, values: tuple, extra: str = "") -> str:
+    labels = [f'{name}="{label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: tuple, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labels = tuple(labels)
+        self.series: dict[tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        with self.lock:
+            counts = self.series.setdefault(labels, [0] * len(self.buckets) + [0, 0.0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = {labels: list(counts) for labels, counts in self.series.items()}
+        for labels, counts in sorted(series.items()):
+            for bound, count in zip(self.buckets, counts):
+                bucket = label_text(self.labels, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket} {count}")
+            bucket = label_text(self.labels, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket} {counts[-2]}")
+            lines.append(
+                f"{self.name}_count{label_text(self.labels, labels)} {counts[-2]}"
+            )
+            lines.append(
+                f"{self.name}_sum{label_text(self.labels, labels)} {counts[-1]}"
+            )
+        return lines
+
+
+request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time to answer a request, up to the start of the response.",
+    LATENCY_BUCKETS,
+    ("method", "route", "status"),
+)
+request_queries = Histogram(
+    "http_request_db_queries",
+    "Number of SQL statements executed while answering a request.",
+    QUERY_BUCKETS,
+    ("method", "route"),
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements while answering a request.",
+    LATENCY_BUCKETS,
+    ("method", "route"),
+)
+password_seconds = Histogram(
+    "password_hash_seconds",
+    "Time to hash or verify a password with bcrypt, including the wait for a worker.",
+    PASSWORD_BUCKETS,
+    ("operation",),
+)
+
+
+def pool_metrics() -> list[str]:
+    gauges = {
+        "size": ("db_pool_size", "gauge", "Connections kept open in the pool."),
+        "checked_out": ("db_pool_checked_out", "gauge", "Connections in use."),
+        "idle": ("db_pool_idle", "gauge", "Connections open and not in use."),
+        "overflow": (
+            "db_pool_overflow",
+            "gauge",
+            "Connections open above the pool size.",
+        ),
+        "checkouts": ("db_pool_checkouts_total", "counter", "Connections checked out."),
+        "checkout_timeouts": (
+            "db_pool_checkout_timeouts_total",
+            "counter",
+            "Checkouts that timed out waiting for a connection.",
+        ),
+        "wait_seconds_total": (
+            "db_pool_wait_seconds_total",
+            "counter",
+            "Time spent waiting to check out a connection.",
+        ),
+    }
+    statistics = {
+        name: pool_statistics(pool_engine) or {}
+        for name, pool_engine in (("sync", engine), ("async", async_engine))
+    }
+    lines = []
+    for key, (name, kind, documentation) in gauges.items():
+        values = [
+            (pool, values[key]) for pool, values in statistics.items() if key in values
+        ]
+        if not values:
+            continue
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{pool="{pool}"}} {value}' for pool, value in values]
+    return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in (
+        request_seconds,
+        request_queries,
+        request_db_seconds,
+        password_seconds,
+    ):
+        lines += histogram.render()
+    lines += pool_metrics()
+    return "\n".join(lines) + "\n"
+
+
+def route_name(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+        instrument_engine(engine)
+        if async_engine is not None:
+            instrument_engine(async_engine.sync_engine)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope)
+        token = request_stats.set(stats)
+        response_status = 500
+        elapsed = None
+        checked_queries = 0
+
+        def check_request_budget():
+            nonlocal checked_queries
+            checked_queries = stats.queries
+            check_budget(
+                scope["method"],
+                route_name(scope),
+                stats.statements,
+                stats.seconds["db"],
+            )
+
+        async def send_with_timing(message):
+            nonlocal response_status, elapsed
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+                elapsed = time.perf_counter() - stats.start
+                check_request_budget()
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            elif (
+                message["type"] == "http.response.body"
+                and not message.get("more_body", False)
+                and stats.queries > checked_queries
+            ):
+                check_request_budget()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            route = route_name(scope)
+            if elapsed is None:
+                elapsed = time.perf_counter() - stats.start
+            request_seconds.observe(elapsed, scope["method"], route, response_status)
+            request_queries.observe(stats.queries, scope["method"], route)
+            request_db_seconds.observe(stats.seconds["db"], scope["method"], route)
@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+
+
+def alembic_config() -> Config:
+    config = Config()
+    config.set_main_option("script_location", str(Path(__file__).parent / "migrations"))
+    return config
+
+
+def upgrade_database(revision: str = "head") -> None:
+    command.upgrade(alembic_config(), revision)
+
+
+if __name__ == "__main__":
+    upgrade_database(*sys.argv[1:2])
@@ -0,0 +1,65 @@
+"""foreign key and lookup indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-08-20 10:05:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT task_id, user_id, COUNT(*) FROM assigntask "
+                "GROUP BY task_id, user_id HAVING COUNT(*) > 1 "
+                "ORDER BY task_id, user_id"
+            )
+        )
+        .all()
+    )
+    if duplicates:
+        pairs = ", ".join(
+            f"task {task_id} / user {user_id} ({count} rows)"
+            for task_id, user_id, count in duplicates[:20]
+        )
+        if len(duplicates) > 20:
+            pairs += f" and {len(duplicates) - 20} more"
+        raise RuntimeError(
+            "Cannot add the unique (task_id, user_id) index on assigntask: "
+            f"{len(duplicates)} task and user pairs are assigned more than once: "
+            f"{pairs}. Remove the extra assignments and run the migration again."
+        )
+    op.create_index(
+        "ix_assigntask_task_id_user_id",
+        "assigntask",
+        ["task_id", "user_id"],
+        unique=True,
+    )
+    op.create_index("ix_assigntask_user_id", "assigntask", ["user_id"])
+    op.create_index("ix_tasks_project_id", "tasks", ["project_id"])
+    op.create_index("ix_tasks_enddate", "tasks", ["enddate"])
+    op.create_index("ix_progress_task_id", "progress", ["task_id"])
+    op.create_index("ix_progress_user_id", "progress", ["user_id"])
+    op.create_index("ix_projects_admin_id", "projects", ["admin_id"])
+    op.create_index("ix_projects_deadline", "projects", ["deadline"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_projects_deadline", "projects")
+    op.drop_index("ix_projects_admin_id", "projects")
+    op.drop_index("ix_progress_user_id", "progress")
+    op.drop_index("ix_progress_task_id", "progress")
+    op.drop_index("ix_tasks_enddate", "tasks")
+    op.drop_index("ix_tasks_project_id", "tasks")
+    op.drop_index("ix_assigntask_user_id", "assigntask")
+    op.drop_index("ix_assigntask_task_id_user_id", "assigntask")
@@ -0,0 +1,57 @@
+"""task and project progress rollups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-09-02 14:10:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tasks",
+        sa.Column("progress_score", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column("tasks", sa.Column("latest_progress_id", sa.Integer(), nullable=True))
+    op.add_column(
+        "projects",
+        sa.Column("task_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "projects",
+        sa.Column(
+            "task_progress_total", sa.Integer(), server_default="0", nullable=False
+        ),
+    )
+    op.execute(
+        "UPDATE tasks SET latest_progress_id = "
+        "(SELECT MAX(progress.id) FROM progress WHERE progress.task_id = tasks.id)"
+    )
+    op.execute(
+        "UPDATE tasks SET progress_score = COALESCE("
+        "(SELECT progress.progress_score FROM progress "
+        "WHERE progress.id = tasks.latest_progress_id), 0)"
+    )
+    op.execute(
+        "UPDATE projects SET "
+        "task_count = (SELECT COUNT(*) FROM tasks WHERE tasks.project_id = projects.id), "
+        "task_progress_total = COALESCE((SELECT SUM(tasks.progress_score) FROM tasks "
+        "WHERE tasks.project_id = projects.id), 0)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("projects") as batch_op:
+        batch_op.drop_column("task_progress_total")
+        batch_op.drop_column("task_count")
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("latest_progress_id")
+        batch_op.drop_column("progress_score")
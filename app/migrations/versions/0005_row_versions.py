@@ -0,0 +1,32 @@
+"""row versions for etags
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-09-09 11:20:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tasks", sa.Column("version", sa.Integer(), server_default="1", nullable=False)
+    )
+    op.add_column(
+        "projects",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("projects") as batch_op:
+        batch_op.drop_column("version")
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,43 @@
+"""full-text search indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-09-16 09:45:00.000000
+
+"""
+
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+search_indexes = {
+    "ix_projects_search": (
+        "projects",
+        "coalesce(name, '') || ' ' || coalesce(description, '')",
+    ),
+    "ix_tasks_search": (
+        "tasks",
+        "coalesce(name, '') || ' ' || coalesce(description, '')",
+    ),
+    "ix_progress_search": ("progress", "coalesce(comment, '')"),
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name, (table, document) in search_indexes.items():
+        op.execute(
+            f"CREATE INDEX {name} ON {table} "
+            f"USING gin (to_tsvector('english', {document}))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name in search_indexes:
+        op.execute(f"DROP INDEX {name}")
@@ -0,0 +1,24 @@
+"""status and due date indexes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-09-23 10:15:00.000000
+
+"""
+
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_tasks_status_enddate", "tasks", ["status", "enddate"])
+    op.create_index("ix_projects_status_deadline", "projects", ["status", "deadline"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_projects_status_deadline", "projects")
+    op.drop_index("ix_tasks_status_enddate", "tasks")
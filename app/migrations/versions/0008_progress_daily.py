@@ -0,0 +1,60 @@
+"""daily progress rollups
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2024-09-30 15:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "progress_daily",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("updates", sa.Integer(), nullable=False),
+        sa.Column("progress_score", sa.Integer(), nullable=False),
+        sa.Column("latest_progress_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+        sa.ForeignKeyConstraint(["task_id"], ["tasks.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_progress_daily_id", "progress_daily", ["id"])
+    op.create_index(
+        "ix_progress_daily_task_id_day",
+        "progress_daily",
+        ["task_id", "day"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_progress_daily_project_id_day", "progress_daily", ["project_id", "day"]
+    )
+    op.execute(
+        "INSERT INTO progress_daily "
+        "(task_id, project_id, day, updates, progress_score, latest_progress_id) "
+        "SELECT progress.task_id, tasks.project_id, progress.date_updated, COUNT(*), "
+        "0, MAX(progress.id) FROM progress JOIN tasks ON tasks.id = progress.task_id "
+        "GROUP BY progress.task_id, tasks.project_id, progress.date_updated"
+    )
+    op.execute(
+        "UPDATE progress_daily SET progress_score = "
+        "(SELECT progress.progress_score FROM progress "
+        "WHERE progress.id = progress_daily.latest_progress_id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_progress_daily_project_id_day", "progress_daily")
+    op.drop_index("ix_progress_daily_task_id_day", "progress_daily")
+    op.drop_index("ix_progress_daily_id", "progress_daily")
+    op.drop_table("progress_daily")
@@ -0,0 +1,33 @@
+"""row modification times for incremental exports
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2024-10-07 09:30:00.000000
+
+"""
+
+from datetime import datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+tables = ("projects", "tasks", "progress")
+
+
+def upgrade() -> None:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for table in tables:
+        op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.execute(sa.text(f"UPDATE {table} SET updated_at = :now").bindparams(now=now))
+        op.create_index(f"ix_{table}_updated_at", table, ["updated_at"])
+
+
+def downgrade() -> None:
+    for table in reversed(tables):
+        op.drop_index(f"ix_{table}_updated_at", table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
@@ -1,31 +1,48 @@
 from .database import Base
 from sqlalchemy.orm import Mapped, mapped_column, Relationship
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from datetime import datetime, timezone, date
 
 
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Tasks(Base):
     __tablename__ = "tasks"
+    __table_args__ = (Index("ix_tasks_status_enddate", "status", "enddate"),)
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), index=True)
     name: Mapped[str]
     description: Mapped[str] = mapped_column(nullable=True)
     status: Mapped[str] = mapped_column(default="in progress")
     startdate: Mapped[date]
-    enddate: Mapped[date]
+    enddate: Mapped[date] = mapped_column(index=True)
+    progress_score: Mapped[int] = mapped_column(default=0, server_default="0")
+    latest_progress_id: Mapped[int] = mapped_column(nullable=True)
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(
+        default=utc_now, onupdate=utc_now, nullable=True, index=True
+    )
     assigned_users: Mapped[list["AssignUserTask"]] = Relationship(
         backref="task", cascade="all, delete"
     )
     task_progress_detail: Mapped[list["TaskProgressInfo"]] = Relationship(
         backref="task", cascade="all, delete"
     )
+    daily_progress: Mapped[list["TaskProgressDaily"]] = Relationship(
+        backref="task", cascade="all, delete"
+    )
 
 
 class AssignUserTask(Base):
     __tablename__ = "assigntask"
+    __table_args__ = (
+        Index("ix_assigntask_task_id_user_id", "task_id", "user_id", unique=True),
+    )
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id"))
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
 
 
 class Users(Base):
@@ -47,27 +64,65 @@ class Users(Base):
 class TaskProgressInfo(Base):
     __tablename__ = "progress"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id"))
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     date_updated: Mapped[date] = mapped_column(
         default=lambda: datetime.now(timezone.utc).date()
     )
     comment: Mapped[str] = mapped_column(nullable=False)
     progress_score: Mapped[int]
+    updated_at: Mapped[datetime] = mapped_column(
+        default=utc_now, onupdate=utc_now, nullable=True, index=True
+    )
+
+
+class TaskProgressDaily(Base):
+    __tablename__ = "progress_daily"
+    __table_args__ = (
+        Index("ix_progress_daily_task_id_day", "task_id", "day", unique=True),
+        Index("ix_progress_daily_project_id_day", "project_id", "day"),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"))
+    day: Mapped[date]
+    updates: Mapped[int]
+    progress_score: Mapped[int]
+    latest_progress_id: Mapped[int]
 
 
 class Projects(Base):
     __tablename__ = "projects"
+    __table_args__ = (Index("ix_projects_status_deadline", "status", "deadline"),)
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    admin_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    admin_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     name: Mapped[str]
     description: Mapped[str]
     date_created: Mapped[date] = mapped_column(
         default=lambda: datetime.now(timezone.utc).date()
     )
-    deadline: Mapped[date]
+    deadline: Mapped[date] = mapped_column(index=True)
     progress_score: Mapped[int] = mapped_column(default=0)
     status: Mapped[str]
+    task_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    task_progress_total: Mapped[int] = mapped_column(default=0, server_default="0")
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(
+        default=utc_now, onupdate=utc_now, nullable=True, index=True
+    )
     project_tasks: Mapped[list["Tasks"]] = Relationship(
         backref="project", cascade="all, delete"
     )
+
+    @property
+    def task_progress(self) -> float:
+        if not self.task_count:
+            return 0
+        return round(self.task_progress_total / self.task_count, 2)
+
+
+class RevokedTokens(Base):
+    __tablename__ = "revoked_tokens"
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    jti: Mapped[str] = mapped_column(unique=True)
+    expires_at: Mapped[datetime] = mapped_column(index=True)
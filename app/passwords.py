@@ -0,0 +1,53 @@
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+import multiprocessing
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1))
+)
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS
+)
+executor: ProcessPoolExecutor | None = None
+executor_lock = threading.Lock()
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(secret=password)
+
+
+def verify_and_update_password(
+    password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(secret=password, hash=hashed_password)
+
+
+def password_executor() -> ProcessPoolExecutor:
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return executor
+
+
+def shutdown_password_executor() -> None:
+    global executor
+    with executor_lock:
+        if executor is not None:
+            executor.shutdown()
+            executor = None
+
+
+def run_in_password_pool(function, *args):
+    if PASSWORD_HASH_WORKERS <= 0:
+        return function(*args)
+    return password_executor().submit(function, *args).result()
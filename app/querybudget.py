@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from greenlet import getcurrent
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off").lower()
+QUERY_BUDGET_QUERIES = int(os.getenv("QUERY_BUDGET_QUERIES", "25"))
+QUERY_BUDGET_DB_MS = float(os.getenv("QUERY_BUDGET_DB_MS", "250"))
+QUERY_BUDGETS = json.loads(os.getenv("QUERY_BUDGETS", "{}"))
+REPORTED_SHAPES = 5
+
+logger = logging.getLogger(__name__)
+package_directory = str(Path(__file__).parent)
+skipped_files = {__file__, str(Path(__file__).parent / "metrics.py")}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def recording_enabled() -> bool:
+    return QUERY_BUDGET_MODE in ("log", "strict")
+
+
+def statement_shape(statement: str) -> str:
+    shape = re.sub(r"\s+", " ", statement).strip()
+    shape = re.sub(r"^SELECT .+? FROM ", "SELECT ... FROM ", shape)
+    shape = re.sub(r"'(?:[^']|'')*'", "?", shape)
+    shape = re.sub(r"\b\d+(?:\.\d+)?\b", "?", shape)
+    shape = re.sub(
+        r"\(\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+|:\w+))+\s*\)",
+        "(...)",
+        shape,
+    )
+    return shape
+
+
+def frame_name(frame) -> str:
+    path = os.path.relpath(frame.f_code.co_filename, Path(package_directory).parent)
+    return f"{frame.f_code.co_name} ({path}:{frame.f_lineno})"
+
+
+def stack_frames():
+    frame = sys._getframe(2)
+    current = getcurrent()
+    while True:
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return
+        frame = current.gr_frame
+
+
+def statement_origin(endpoint: str | None = None) -> str:
+    frames = []
+    for frame in stack_frames():
+        filename = frame.f_code.co_filename
+        if filename.startswith(package_directory) and filename not in skipped_files:
+            frames.append(frame)
+    if not frames:
+        if endpoint:
+            return f"response serialization of {endpoint}"
+        return "outside the app"
+    if len(frames) == 1:
+        return frame_name(frames[0])
+    return f"{frame_name(frames[-1])} via {frame_name(frames[0])}"
+
+
+def route_budget(method: str, route: str) -> tuple[int, float]:
+    budget = QUERY_BUDGETS.get(f"{method} {route}", {})
+    return (
+        budget.get("queries", QUERY_BUDGET_QUERIES),
+        budget.get("db_ms", QUERY_BUDGET_DB_MS),
+    )
+
+
+def budget_report(
+    method: str,
+    route: str,
+    statements: list[tuple[str, float, str]],
+    db_seconds: float,
+) -> str | None:
+    max_queries, max_db_ms = route_budget(method, route)
+    db_ms = db_seconds * 1000
+    if len(statements) <= max_queries and db_ms <= max_db_ms:
+        return None
+    counts = Counter()
+    durations = Counter()
+    for statement, elapsed, origin in statements:
+        key = (statement_shape(statement), origin)
+        counts[key] += 1
+        durations[key] += elapsed * 1000
+    lines = [
+        f"{method} {route} ran {len(statements)} queries (budget {max_queries}) "
+        f"taking {db_ms:.1f} ms (budget {max_db_ms:g} ms)."
+    ]
+    for (shape, origin), count in counts.most_common(REPORTED_SHAPES):
+        lines.append(
+            f"  {count} x {durations[(shape, origin)]:.1f} ms: {shape[:300]} "
+            f"from {origin}"
+        )
+    return "\n".join(lines)
+
+
+def check_budget(
+    method: str,
+    route: str,
+    statements: list[tuple[str, float, str]] | None,
+    db_seconds: float,
+) -> None:
+    if statements is None:
+        return
+    report = budget_report(method, route, statements, db_seconds)
+    if report is None:
+        return
+    if QUERY_BUDGET_MODE == "strict":
+        raise QueryBudgetExceeded(report)
+    logger.warning(report)
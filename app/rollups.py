@@ -0,0 +1,157 @@
+from sqlalchemy.orm import Session
+from .models import Projects, Tasks, TaskProgressInfo, TaskProgressDaily
+
+
+def lock_task(db: Session, task_id: int) -> Tasks:
+    return (
+        db.query(Tasks)
+        .filter(Tasks.id == task_id)
+        .with_for_update()
+        .populate_existing()
+        .one()
+    )
+
+
+def update_project_rollup(
+    db: Session, project_id: int, task_count: int = 0, progress_total: int = 0
+):
+    if not task_count and not progress_total:
+        return
+    db.query(Projects).filter(Projects.id == project_id).update(
+        {
+            Projects.task_count: Projects.task_count + task_count,
+            Projects.task_progress_total: Projects.task_progress_total + progress_total,
+        },
+        synchronize_session=False,
+    )
+
+
+def set_task_progress(
+    db: Session, task: Tasks, progress_score: int, latest_progress_id: int | None
+):
+    progress_delta = progress_score - task.progress_score
+    task.progress_score = progress_score
+    task.latest_progress_id = latest_progress_id
+    update_project_rollup(db, task.project_id, progress_total=progress_delta)
+
+
+def task_added(db: Session, task: Tasks):
+    update_project_rollup(
+        db, task.project_id, task_count=1, progress_total=task.progress_score or 0
+    )
+
+
+def tasks_imported(db: Session, project_id: int, task_count: int):
+    update_project_rollup(db, project_id, task_count=task_count)
+
+
+def task_deleted(db: Session, task: Tasks):
+    task = lock_task(db, task.id)
+    update_project_rollup(
+        db, task.project_id, task_count=-1, progress_total=-task.progress_score
+    )
+
+
+def daily_progress_added(db: Session, task: Tasks, progress: TaskProgressInfo):
+    daily = (
+        db.query(TaskProgressDaily)
+        .filter(
+            (TaskProgressDaily.task_id == task.id)
+            & (TaskProgressDaily.day == progress.date_updated)
+        )
+        .first()
+    )
+    if daily is None:
+        db.add(
+            TaskProgressDaily(
+                task_id=task.id,
+                project_id=task.project_id,
+                day=progress.date_updated,
+                updates=1,
+                progress_score=progress.progress_score,
+                latest_progress_id=progress.id,
+            )
+        )
+        return
+    daily.updates += 1
+    if progress.id > daily.latest_progress_id:
+        daily.progress_score = progress.progress_score
+        daily.latest_progress_id = progress.id
+
+
+def daily_progress_edited(
+    db: Session, progress_id: int, task_id: int, progress_score: int
+):
+    db.query(TaskProgressDaily).filter(
+        (TaskProgressDaily.task_id == task_id)
+        & (TaskProgressDaily.latest_progress_id == progress_id)
+    ).update({TaskProgressDaily.progress_score: progress_score})
+
+
+def daily_progress_deleted(db: Session, progress_id: int, task_id: int):
+    day = (
+        db.query(TaskProgressInfo.date_updated)
+        .filter(TaskProgressInfo.id == progress_id)
+        .scalar()
+    )
+    daily = (
+        db.query(TaskProgressDaily)
+        .filter((TaskProgressDaily.task_id == task_id) & (TaskProgressDaily.day == day))
+        .first()
+    )
+    if daily is None:
+        return
+    if daily.updates <= 1:
+        db.delete(daily)
+        return
+    daily.updates -= 1
+    if daily.latest_progress_id != progress_id:
+        return
+    previous = (
+        db.query(TaskProgressInfo.id, TaskProgressInfo.progress_score)
+        .filter(
+            (TaskProgressInfo.task_id == task_id)
+            & (TaskProgressInfo.date_updated == day)
+            & (TaskProgressInfo.id != progress_id)
+        )
+        .order_by(TaskProgressInfo.id.desc())
+        .first()
+    )
+    daily.progress_score = previous.progress_score
+    daily.latest_progress_id = previous.id
+
+
+def progress_added(db: Session, progress: TaskProgressInfo):
+    task = lock_task(db, progress.task_id)
+    set_task_progress(db, task, progress.progress_score, progress.id)
+    daily_progress_added(db, task, progress)
+
+
+def progress_edited(
+    db: Session, progress_id: int, task_id: int, progress_score: int
+) -> Tasks:
+    task = lock_task(db, task_id)
+    daily_progress_edited(db, progress_id, task_id, progress_score)
+    if task.latest_progress_id == progress_id:
+        set_task_progress(db, task, progress_score, progress_id)
+    return task
+
+
+def progress_deleted(db: Session, progress_id: int, task_id: int) -> Tasks:
+    task = lock_task(db, task_id)
+    daily_progress_deleted(db, progress_id, task_id)
+    if task.latest_progress_id != progress_id:
+        return task
+    previous = (
+        db.query(TaskProgressInfo.id, TaskProgressInfo.progress_score)
+        .filter(
+            (TaskProgressInfo.task_id == task_id) & (TaskProgressInfo.id != progress_id)
+        )
+        .order_by(TaskProgressInfo.id.desc())
+        .first()
+    )
+    if previous:
+        set_task_progress(db, task, previous.progress_score, previous.id)
+    else:
+        set_task_progress(db, task, 0, None)
+    return task
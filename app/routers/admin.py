@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from ..authenticate import get_current_user
+from ..database import async_engine, engine, pool_statistics
+from ..util import is_user_allowed
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get(
+    "/pool",
+    description="This endpoint can only be accessed by authenticated admins. It reports the state of the database connection pools: connections checked out, idle and in overflow, and the time requests spent waiting to check out a connection.",
+)
+def get_pool_statistics(user: dict = Depends(get_current_user)):
+    is_user_allowed(user_role=user.get("role"), endpoint_allowed_role="admin")
+    return {
+        "sync": pool_statistics(engine),
+        "async": pool_statistics(async_engine),
+    }
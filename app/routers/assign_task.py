@@ -4,7 +4,14 @@ from sqlalchemy.orm import Session
 from ..authenticate import get_current_user
 from ..models import Tasks, AssignUserTask, Projects, Users
 from ..schemas import TaskOut
-from ..util import create_new_item, get_all_items, get_item_by_id, is_user_allowed
+from ..cache import invalidate, task_keys
+from ..etags import bump_versions
+from ..util import (
+    bulk_create_new_items,
+    create_new_item,
+    get_item_by_id,
+    is_user_allowed,
+)
 
 router = APIRouter(tags=["Task Assignment"])
 
@@ -32,38 +39,20 @@ def assign_multiple_users_to_a_task(
         )
     not_found = []
     found = []
-    already_added = []
     guest = []
-    for user_id in users_id:
-        try:
-            user = get_item_by_id(user_id, db, Users, "user")
-            if user.role == "guest":
-                guest.append(user_id)
-            else:
-                found.append(user_id)
-        except:
+    requested_ids = list(dict.fromkeys(users_id))
+    users_role = dict(
+        db.query(Users.id, Users.role).filter(Users.id.in_(requested_ids)).all()
+    )
+    for user_id in requested_ids:
+        role = users_role.get(user_id)
+        if role is None:
             not_found.append(user_id)
-    if found:
-        all_assignments = get_all_items(db, AssignUserTask)
-        specific_task_assignments = [
-            assign for assign in all_assignments if assign.task_id == task_id
-        ]
-        for user_id in found:
-            try:
-                for assign in specific_task_assignments:
-                    if assign.user_id == user_id:
-                        raise HTTPException(
-                            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                            detail={
-                                "message": f"The user with id {user_id} has already been assigned to this task."
-                            },
-                        )
-            except:
-                already_added.append(user_id)
-            else:
-                assignment_dict = {"task_id": task_id, "user_id": user_id}
-                _ = create_new_item(assignment_dict, db, AssignUserTask)
-    else:
+        elif role == "guest":
+            guest.append(user_id)
+        else:
+            found.append(user_id)
+    if not found:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
@@ -72,6 +61,15 @@ def assign_multiple_users_to_a_task(
                 "guest": guest,
             },
         )
+    assignments = [{"task_id": task_id, "user_id": user_id} for user_id in found]
+    cache_keys = task_keys(task_id, project.id)
+    bump_versions(db, task_ids=[task_id], project_ids=[project.id])
+    created = bulk_create_new_items(
+        assignments, db, AssignUserTask, [AssignUserTask.user_id]
+    )
+    invalidate(cache_keys)
+    created_ids = {user_id for (user_id,) in created}
+    already_added = [user_id for user_id in found if user_id not in created_ids]
     return_dict = {
         "message": f"Users with id {found} were successfully added to task {task_id}",
         "input_ids_details": {
@@ -114,21 +112,26 @@ def assign_one_user_to_a_task(
                 "message": f"The user with id {user_id} is a guest, and cannot be assigned a task."
             },
         )
-    all_assignments = get_all_items(db, AssignUserTask)
-    specific_task_assignments = [
-        assign for assign in all_assignments if assign.task_id == task_id
-    ]
-    for assign in specific_task_assignments:
-        if assign.user_id == user_id:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail={
-                    "message": f"The user with id {user_id} has already been assigned to this task."
-                },
-            )
+    assignment = (
+        db.query(AssignUserTask.id)
+        .filter(
+            (AssignUserTask.task_id == task_id) & (AssignUserTask.user_id == user_id)
+        )
+        .first()
+    )
+    if assignment:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "message": f"The user with id {user_id} has already been assigned to this task."
+            },
+        )
     assignment_dict = {"task_id": task_id, "user_id": user_id}
+    cache_keys = task_keys(task_id, project.id)
+    bump_versions(db, task_ids=[task_id], project_ids=[project.id])
     _ = create_new_item(assignment_dict, db, AssignUserTask)
-    updated_task = get_item_by_id(task_id, db, Tasks, "task")
+    invalidate(cache_keys)
+    updated_task = get_item_by_id(task_id, db, Tasks, "task", TaskOut)
     return updated_task
 
 
@@ -166,5 +169,8 @@ def remove_user_from_task(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"message": f"User {user_id} is not assigned to task {task_id}."},
         )
+    cache_keys = task_keys(task_id, project.id)
+    bump_versions(db, task_ids=[task_id], project_ids=[project.id])
     db.delete(assignment)
     db.commit()
+    invalidate(cache_keys)
@@ -0,0 +1,172 @@
+from fastapi import APIRouter, Depends, Header, Query, Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import async_db_session
+from ..authenticate import async_get_current_user
+from ..models import Projects, Tasks, Users
+from ..schemas import ProjectOut, TaskOut, UserOut, UserTaskOut
+from ..cache import async_get_cached_item_by_id
+from ..etags import (
+    async_get_page_etag,
+    conditional_response,
+    etag_matches,
+    not_modified,
+    set_etag,
+)
+from ..serializers import json_response
+from ..fieldsets import fieldset
+from ..util import (
+    async_get_item_by_id,
+    async_get_page_of_items,
+    is_user_allowed,
+    split_date_page,
+)
+from .projects import project_filters
+from .tasks import task_filters
+from .users import user_filters, user_tasks_statement
+
+router = APIRouter(include_in_schema=False)
+
+
+@router.get(
+    "/projects/",
+    response_model=list[ProjectOut],
+    dependencies=[Depends(async_get_current_user)],
+)
+async def async_get_all_projects(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list = Depends(project_filters),
+    schema: type[BaseModel] = Depends(fieldset(ProjectOut)),
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(async_db_session),
+):
+    etag = await async_get_page_etag(db, Projects, limit, cursor, filters, schema)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    all_projects, next_cursor = await async_get_page_of_items(
+        db, Projects, limit, cursor, filters, schema
+    )
+    set_etag(response, etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(all_projects, list[schema], response.headers)
+
+
+@router.get(
+    "/projects/{project_id}",
+    response_model=ProjectOut,
+    dependencies=[Depends(async_get_current_user)],
+)
+async def async_get_project_by_id(
+    project_id: int,
+    schema: type[BaseModel] = Depends(fieldset(ProjectOut)),
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(async_db_session),
+):
+    etag, project = await async_get_cached_item_by_id(
+        project_id, db, Projects, "project", schema, if_none_match
+    )
+    return conditional_response(project, etag, if_none_match)
+
+
+@router.get(
+    "/tasks",
+    response_model=list[TaskOut],
+    dependencies=[Depends(async_get_current_user)],
+)
+async def async_get_all_tasks(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list = Depends(task_filters),
+    schema: type[BaseModel] = Depends(fieldset(TaskOut)),
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(async_db_session),
+):
+    etag = await async_get_page_etag(db, Tasks, limit, cursor, filters, schema)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    all_tasks, next_cursor = await async_get_page_of_items(
+        db, Tasks, limit, cursor, filters, schema
+    )
+    set_etag(response, etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(all_tasks, list[schema], response.headers)
+
+
+@router.get(
+    "/tasks/{task_id}",
+    response_model=TaskOut,
+    dependencies=[Depends(async_get_current_user)],
+)
+async def async_get_task_by_id(
+    task_id: int,
+    schema: type[BaseModel] = Depends(fieldset(TaskOut)),
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(async_db_session),
+):
+    etag, task = await async_get_cached_item_by_id(
+        task_id, db, Tasks, "task", schema, if_none_match
+    )
+    return conditional_response(task, etag, if_none_match)
+
+
+@router.get("/users/", response_model=list[UserOut])
+async def async_get_all_users(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list = Depends(user_filters),
+    schema: type[BaseModel] = Depends(fieldset(UserOut)),
+    user: dict = Depends(async_get_current_user),
+    db: AsyncSession = Depends(async_db_session),
+):
+    is_user_allowed(user_role=user.get("role"), endpoint_allowed_role="admin")
+    users, next_cursor = await async_get_page_of_items(
+        db, Users, limit, cursor, filters, schema
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(users, list[schema], response.headers)
+
+
+@router.get("/users/profile", response_model=UserOut)
+async def async_get_current_user_profile(
+    schema: type[BaseModel] = Depends(fieldset(UserOut)),
+    user: dict = Depends(async_get_current_user),
+    db: AsyncSession = Depends(async_db_session),
+):
+    user = await async_get_item_by_id(user.get("id"), db, Users, "user", schema)
+    return json_response(user, schema)
+
+
+@router.get("/users/me/tasks", response_model=list[UserTaskOut])
+async def async_get_current_user_tasks(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list = Depends(task_filters),
+    user: dict = Depends(async_get_current_user),
+    db: AsyncSession = Depends(async_db_session),
+):
+    statement = user_tasks_statement(user.get("id"), limit, cursor, filters)
+    rows = (await db.execute(statement)).all()
+    tasks, next_cursor = split_date_page(rows, limit, "enddate")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(tasks, list[UserTaskOut], response.headers)
+
+
+@router.get("/users/{user_id}", response_model=UserOut)
+async def async_get_user(
+    user_id: int,
+    schema: type[BaseModel] = Depends(fieldset(UserOut)),
+    user: dict = Depends(async_get_current_user),
+    db: AsyncSession = Depends(async_db_session),
+):
+    is_user_allowed(user_role=user.get("role"), endpoint_allowed_role="admin")
+    user = await async_get_item_by_id(user_id, db, Users, "user", schema)
+    return json_response(user, schema)
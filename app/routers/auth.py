@@ -1,22 +1,62 @@
 from fastapi import APIRouter, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
-from ..authenticate import JWT, verify_user
+from ..authenticate import (
+    get_current_user,
+    invalid_token_error,
+    issue_tokens,
+    login_slot,
+    revocation_store,
+    verify_refresh_token,
+    verify_user,
+)
 from ..database import db_session
+from ..models import Users
+from ..schemas import TokenOut, TokenRefreshIn
 from sqlalchemy.orm import Session
 
-
 router = APIRouter(prefix="/auth", tags=["Login"])
-jwt_obj = JWT()
 
 
 @router.post(
     "/login",
-    description="This endpoint is used to authenticate the user. The access token is generated and attached to the header using this endpoint.",
+    response_model=TokenOut,
+    description="This endpoint is used to authenticate the user. The access token is generated and attached to the header using this endpoint. The access token expires after `expires_in` seconds; the refresh token returned alongside it can be exchanged at `/auth/refresh` for a new pair without sending the password again.",
 )
 def login(
     formdata: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(db_session)
 ):
-    user = verify_user(formdata.username, formdata.password, db)
-    payload = {"id": user.id, "role": user.role}
-    token = jwt_obj.jwt_encode(payload=payload)
-    return {"access_token": token, "token_type": "bearer"}
+    with login_slot():
+        user = verify_user(formdata.username, formdata.password, db)
+    return issue_tokens(user)
+
+
+@router.post(
+    "/refresh",
+    response_model=TokenOut,
+    description="This endpoint exchanges a refresh token for a new access token and a new refresh token. Each refresh token can only be used once; the one sent is revoked.",
+)
+def refresh(token_in: TokenRefreshIn, db: Session = Depends(db_session)):
+    payload = verify_refresh_token(token_in.refresh_token, db)
+    user = db.query(Users).filter(Users.id == payload.get("id")).first()
+    if not user:
+        raise invalid_token_error("The refresh token is invalid.")
+    if not revocation_store.revoke(payload["jti"], payload["exp"], db):
+        raise invalid_token_error("The refresh token has been revoked.")
+    return issue_tokens(user)
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    description="This endpoint revokes the current access token and the given refresh token.",
+)
+def logout(
+    token_in: TokenRefreshIn,
+    user: dict = Depends(get_current_user),
+    db: Session = Depends(db_session),
+):
+    payload = verify_refresh_token(token_in.refresh_token, db)
+    if payload.get("id") != user.get("id"):
+        raise invalid_token_error("The refresh token is invalid.")
+    revocation_store.revoke(user["jti"], user["exp"], db)
+    revocation_store.revoke(payload["jti"], payload["exp"], db)
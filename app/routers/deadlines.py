@@ -0,0 +1,114 @@
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Literal
+from datetime import datetime, timedelta, timezone
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..authenticate import get_current_user
+from ..database import db_session
+from ..fieldsets import fieldset
+from ..models import AssignUserTask, Projects, Tasks
+from ..schemas import ProjectOut, TaskOut
+from ..serializers import json_response
+from ..util import get_page_of_items_by_date
+
+router = APIRouter(prefix="/deadlines", tags=["Deadlines"])
+
+OPEN_STATUSES = ("in progress", "suspended")
+
+
+def due_window_filters(
+    date_column,
+    status_column,
+    window: Literal["overdue", "due_soon"],
+    days: int,
+) -> list:
+    today = datetime.now(timezone.utc).date()
+    filters = [status_column.in_(OPEN_STATUSES)]
+    if window == "overdue":
+        filters.append(date_column < today)
+    else:
+        filters.append(date_column.between(today, today + timedelta(days=days)))
+    return filters
+
+
+def deadline_task_filters(
+    window: Literal["overdue", "due_soon"] = "overdue",
+    days: int = Query(default=7, ge=0, le=365),
+    project_id: int | None = None,
+    user_id: int | None = None,
+) -> list:
+    filters = due_window_filters(Tasks.enddate, Tasks.status, window, days)
+    if project_id is not None:
+        filters.append(Tasks.project_id == project_id)
+    if user_id is not None:
+        filters.append(
+            Tasks.id.in_(
+                select(AssignUserTask.task_id).where(AssignUserTask.user_id == user_id)
+            )
+        )
+    return filters
+
+
+def deadline_project_filters(
+    window: Literal["overdue", "due_soon"] = "overdue",
+    days: int = Query(default=7, ge=0, le=365),
+    admin_id: int | None = None,
+    user_id: int | None = None,
+) -> list:
+    filters = due_window_filters(Projects.deadline, Projects.status, window, days)
+    if admin_id is not None:
+        filters.append(Projects.admin_id == admin_id)
+    if user_id is not None:
+        filters.append(
+            Projects.id.in_(
+                select(Tasks.project_id)
+                .join(AssignUserTask, AssignUserTask.task_id == Tasks.id)
+                .where(AssignUserTask.user_id == user_id)
+            )
+        )
+    return filters
+
+
+@router.get(
+    "/tasks",
+    response_model=list[TaskOut],
+    dependencies=[Depends(get_current_user)],
+    description="This endpoint lists open tasks (in progress or suspended) that are overdue (`window=overdue`, end date before today) or due within the next `days` days (`window=due_soon`), ordered by end date. Tasks can be scoped to a project or to the tasks assigned to a user. Results are returned in pages of at most `limit` tasks. When more tasks are available, the `X-Next-Cursor` response header holds the cursor to pass back to fetch the next page.",
+)
+def get_task_deadlines(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list = Depends(deadline_task_filters),
+    schema: type[BaseModel] = Depends(fieldset(TaskOut)),
+    db: Session = Depends(db_session),
+):
+    tasks, next_cursor = get_page_of_items_by_date(
+        db, Tasks, Tasks.enddate, limit, cursor, filters, schema
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(tasks, list[schema], response.headers)
+
+
+@router.get(
+    "/projects",
+    response_model=list[ProjectOut],
+    dependencies=[Depends(get_current_user)],
+    description="This endpoint lists open projects (in progress or suspended) that are overdue (`window=overdue`, deadline before today) or due within the next `days` days (`window=due_soon`), ordered by deadline. Projects can be scoped to an admin or to the projects with tasks assigned to a user. Results are returned in pages of at most `limit` projects. When more projects are available, the `X-Next-Cursor` response header holds the cursor to pass back to fetch the next page.",
+)
+def get_project_deadlines(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list = Depends(deadline_project_filters),
+    schema: type[BaseModel] = Depends(fieldset(ProjectOut)),
+    db: Session = Depends(db_session),
+):
+    projects, next_cursor = get_page_of_items_by_date(
+        db, Projects, Projects.deadline, limit, cursor, filters, schema
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(projects, list[schema], response.headers)
@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime, time
+from typing import Annotated, Literal
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from ..authenticate import get_current_user
+from ..database import sessionLocal
+from ..models import Projects, Tasks, TaskProgressInfo
+from ..schemas import DateQuery
+from ..util import is_user_allowed
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+datasets = {
+    "projects": (
+        Projects,
+        [
+            Projects.id,
+            Projects.admin_id,
+            Projects.name,
+            Projects.description,
+            Projects.status,
+            Projects.date_created,
+            Projects.deadline,
+            Projects.progress_score,
+            Projects.task_count,
+            Projects.task_progress_total,
+            Projects.updated_at,
+        ],
+    ),
+    "tasks": (
+        Tasks,
+        [
+            Tasks.id,
+            Tasks.project_id,
+            Tasks.name,
+            Tasks.description,
+            Tasks.status,
+            Tasks.startdate,
+            Tasks.enddate,
+            Tasks.progress_score,
+            Tasks.updated_at,
+        ],
+    ),
+    "progress": (
+        TaskProgressInfo,
+        [
+            TaskProgressInfo.id,
+            TaskProgressInfo.task_id,
+            TaskProgressInfo.user_id,
+            TaskProgressInfo.date_updated,
+            TaskProgressInfo.comment,
+            TaskProgressInfo.progress_score,
+            TaskProgressInfo.updated_at,
+        ],
+    ),
+}
+
+
+def export_batches(dataset: str, since: date | None = None):
+    Model, columns = datasets[dataset]
+    statement = select(*columns).order_by(Model.id)
+    if since:
+        statement = statement.where(
+            Model.updated_at >= datetime.combine(since, time.min)
+        )
+    with sessionLocal() as db:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        yield list(result.keys())
+        for rows in result.partitions():
+            yield rows
+
+
+def ndjson_lines(batches):
+    _ = next(batches)
+    for rows in batches:
+        yield "".join(
+            json.dumps(row._asdict(), default=str, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+def csv_lines(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(next(batches))
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get(
+    "/{dataset}",
+    description="This endpoint can only be accessed by authenticated admins. It streams every project, task or progress update as flat rows ordered by id, in NDJSON (one JSON object per line) or CSV format. The optional `since` date (dd-mm-yyyy) limits the export to rows created or changed on or after that date (UTC), using their `updated_at` column.",
+)
+def export_dataset(
+    dataset: Literal["projects", "tasks", "progress"],
+    export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    since: Annotated[DateQuery, Query(examples=["10-12-2024"])] = None,
+    user: dict = Depends(get_current_user),
+):
+    is_user_allowed(user_role=user.get("role"), endpoint_allowed_role="admin")
+    batches = export_batches(dataset, since)
+    if export_format == "csv":
+        return StreamingResponse(
+            csv_lines(batches),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{dataset}.csv"'},
+        )
+    return StreamingResponse(ndjson_lines(batches), media_type="application/x-ndjson")
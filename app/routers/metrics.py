@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..metrics import render_metrics
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    description="This endpoint exposes request latency, SQL query count and database time histograms per route, password hashing timings and connection pool gauges in the Prometheus text format.",
+)
+def get_metrics():
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,12 +1,33 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Response, Header
+from typing import Annotated, Literal
+from pydantic import BaseModel
 from ..database import db_session
 from sqlalchemy.orm import Session
 from ..authenticate import get_current_user
 from ..models import Projects
-from ..schemas import ProjectOut, ProjectIn, ProjectUpdateIn
+from ..schemas import (
+    ProjectOut,
+    ProjectIn,
+    ProjectUpdateIn,
+    ProjectProgressSeriesOut,
+    DateQuery,
+)
+from ..cache import get_cached_item_by_id, entity_keys, invalidate, project_keys
+from ..serializers import json_response
+from ..fieldsets import fieldset
+from ..timeseries import progress_timeseries
+from ..search import reindex, unindex
+from ..etags import (
+    bump_versions,
+    conditional_response,
+    etag_matches,
+    get_page_etag,
+    not_modified,
+    set_etag,
+)
 from ..util import (
     create_new_item,
-    get_all_items,
+    get_page_of_items,
     get_item_by_id,
     update_item,
     delete_item,
@@ -16,26 +37,87 @@ from ..util import (
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
 
+def project_filters(
+    status_filter: (
+        Literal["in progress", "completed", "suspended", "cancelled"] | None
+    ) = Query(default=None, alias="status"),
+    admin_id: int | None = None,
+    deadline_from: Annotated[DateQuery, Query(examples=["10-12-2024"])] = None,
+    deadline_to: Annotated[DateQuery, Query(examples=["10-02-2025"])] = None,
+) -> list:
+    filters = []
+    if status_filter:
+        filters.append(Projects.status == status_filter)
+    if admin_id is not None:
+        filters.append(Projects.admin_id == admin_id)
+    if deadline_from:
+        filters.append(Projects.deadline >= deadline_from)
+    if deadline_to:
+        filters.append(Projects.deadline <= deadline_to)
+    return filters
+
+
 @router.get(
     "/",
     response_model=list[ProjectOut],
-    description="This endpoint allows all users to view all the projectes in the database after they have been authenticated.",
+    description="This endpoint allows all users to view the projects in the database after they have been authenticated. Results are ordered by id and returned in pages of at most `limit` projects. When more projects are available, the `X-Next-Cursor` response header holds the cursor to pass back to fetch the next page. Projects can be filtered by status, admin and deadline range (dates in dd-mm-yyyy format). Every page carries an `ETag`; sending it back in `If-None-Match` returns `304 Not Modified` while the page is unchanged.",
     dependencies=[Depends(get_current_user)],
 )
-def get_all_projects(db: Session = Depends(db_session)):
-    all_projects = get_all_items(db, Projects)
-    return all_projects
+def get_all_projects(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list = Depends(project_filters),
+    schema: type[BaseModel] = Depends(fieldset(ProjectOut)),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(db_session),
+):
+    etag = get_page_etag(db, Projects, limit, cursor, filters, schema)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    all_projects, next_cursor = get_page_of_items(
+        db, Projects, limit, cursor, filters, schema
+    )
+    set_etag(response, etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(all_projects, list[schema], response.headers)
 
 
 @router.get(
     "/{project_id}",
     response_model=ProjectOut,
-    description="This endpoint allows all users to view specific project by id after they have been authenticated.",
+    description="This endpoint allows all users to view specific project by id after they have been authenticated. The response carries an `ETag`; sending it back in `If-None-Match` returns `304 Not Modified` while the project, its tasks and their assignments and progress updates are unchanged.",
+    dependencies=[Depends(get_current_user)],
+)
+def get_project_by_id(
+    project_id: int,
+    schema: type[BaseModel] = Depends(fieldset(ProjectOut)),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(db_session),
+):
+    etag, project = get_cached_item_by_id(
+        project_id, db, Projects, "project", schema, if_none_match
+    )
+    return conditional_response(project, etag, if_none_match)
+
+
+@router.get(
+    "/{project_id}/progress/timeseries",
+    response_model=ProjectProgressSeriesOut,
+    description="This endpoint allows all users to view how a project and each of its tasks progressed over time after they have been authenticated. Points are grouped by `interval` (day, or week starting on Monday) and hold the latest progress score in that period and the number of updates made. The project score of a period averages the latest score of every task that had started by the end of that period (or already had updates), counting tasks without updates as 0. The optional `start` and `end` dates (dd-mm-yyyy) limit the periods returned.",
     dependencies=[Depends(get_current_user)],
 )
-def get_project_by_id(project_id: int, db: Session = Depends(db_session)):
+def get_project_progress_timeseries(
+    project_id: int,
+    interval: Literal["day", "week"] = "day",
+    start: Annotated[DateQuery, Query(examples=["10-12-2024"])] = None,
+    end: Annotated[DateQuery, Query(examples=["10-02-2025"])] = None,
+    db: Session = Depends(db_session),
+):
     project = get_item_by_id(project_id, db, Projects, "project")
-    return project
+    series = progress_timeseries(db, project, interval, start, end)
+    return json_response(series, ProjectProgressSeriesOut)
 
 
 @router.post(
@@ -52,7 +134,8 @@ def create_project(
     is_user_allowed(user_role=user.get("role"), endpoint_allowed_role="admin")
     project_dict = project_in.model_dump()
     project_dict.update({"admin_id": user.get("id")})
-    project = create_new_item(project_dict, db, Projects)
+    project = create_new_item(project_dict, db, Projects, schema=ProjectOut)
+    reindex(db, "project", project.id)
     return project
 
 
@@ -78,9 +161,17 @@ def update_project(
                 "message": f"Only the admin with id {project.admin_id} can edit this project."
             },
         )
+    bump_versions(db, project_ids=[project_id])
     project = update_item(
-        project_id, project_update.model_dump(), db, Projects, "project"
+        project_id,
+        project_update.model_dump(),
+        db,
+        Projects,
+        "project",
+        schema=ProjectOut,
     )
+    invalidate(entity_keys(Projects, project_id))
+    reindex(db, "project", project_id)
     return project
 
 
@@ -104,4 +195,7 @@ def delete_project(
                 "message": f"Only the admin with id {project.admin_id} can edit this project."
             },
         )
+    cache_keys = project_keys(db, project_id)
     delete_item(project_id, db, Projects, "project")
+    invalidate(cache_keys)
+    unindex(project_ids=[project_id])
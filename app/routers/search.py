@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, Query, Response
+from typing import Literal
+from sqlalchemy.orm import Session
+from ..authenticate import get_current_user
+from ..database import db_session
+from ..schemas import SearchResultOut
+from ..search import search_items
+from ..serializers import json_response
+from ..util import decode_cursor_payload, encode_cursor, invalid_cursor_error
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+def decode_offset_cursor(cursor: str | None) -> int:
+    if not cursor:
+        return 0
+    offset = decode_cursor_payload(cursor).get("offset")
+    if not isinstance(offset, int) or offset < 0:
+        raise invalid_cursor_error()
+    return offset
+
+
+@router.get(
+    "/",
+    response_model=list[SearchResultOut],
+    dependencies=[Depends(get_current_user)],
+    description="This endpoint allows authenticated users to search the names and descriptions of projects and tasks and the comments of progress updates. Words are matched in any order and every word must match; quoted phrases, `or` and `-word` are supported on Postgres. Results are ordered by relevance and returned in pages of at most `limit` results. When more results are available, the `X-Next-Cursor` response header holds the cursor to pass back to fetch the next page. Use `type` to search only some kinds of results.",
+)
+def search(
+    response: Response,
+    q: str = Query(min_length=1, max_length=200, examples=["payment gateway"]),
+    result_types: list[Literal["project", "task", "progress"]] | None = Query(
+        default=None, alias="type"
+    ),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    db: Session = Depends(db_session),
+):
+    offset = decode_offset_cursor(cursor)
+    kinds = list(dict.fromkeys(result_types or ["project", "task", "progress"]))
+    results = search_items(db, q, kinds, limit, offset)
+    if len(results) > limit:
+        results = results[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            results[-1]["id"], offset=offset + limit
+        )
+    return json_response(results, list[SearchResultOut], response.headers)
@@ -5,6 +5,10 @@ from ..authenticate import get_current_user
 from ..models import TaskProgressInfo, Tasks, Projects
 from ..schemas import TaskOut, ProgressIn
 from ..util import create_new_item, get_item_by_id, update_item, delete_item
+from ..cache import invalidate, task_keys
+from ..search import reindex
+from ..etags import bump_versions
+from .. import rollups
 
 router = APIRouter(prefix="/updates", tags=["Task Progress Update"])
 
@@ -43,8 +47,14 @@ def add_task_progress_update(
         )
     progress_dict = update.model_dump()
     progress_dict.update({"user_id": user.get("id"), "task_id": task_id})
-    _ = create_new_item(progress_dict, db, TaskProgressInfo)
-    task_updated = get_item_by_id(task_id, db, Tasks, "task")
+    progress = create_new_item(progress_dict, db, TaskProgressInfo, commit=False)
+    rollups.progress_added(db, progress)
+    cache_keys = task_keys(task_id, project.id)
+    bump_versions(db, task_ids=[task_id], project_ids=[project.id])
+    db.commit()
+    invalidate(cache_keys)
+    reindex(db, "progress", progress.id)
+    task_updated = get_item_by_id(task_id, db, Tasks, "task", TaskOut)
     return task_updated
 
 
@@ -68,8 +78,18 @@ def edit_task_progress_update(
             status_code=status.HTTP_403_FORBIDDEN,
             detail={"message": "You cannot edit this task progress update."},
         )
-    _ = update_item(progress_id, update.model_dump(), db, TaskProgressInfo)
-    task_update = get_item_by_id(progress_update.task_id, db, Tasks, "task")
+    _ = update_item(
+        progress_id, update.model_dump(), db, TaskProgressInfo, commit=False
+    )
+    task = rollups.progress_edited(
+        db, progress_id, progress_update.task_id, update.progress_score
+    )
+    cache_keys = task_keys(task.id, task.project_id)
+    bump_versions(db, task_ids=[task.id], project_ids=[task.project_id])
+    db.commit()
+    invalidate(cache_keys)
+    reindex(db, "progress", progress_id)
+    task_update = get_item_by_id(progress_update.task_id, db, Tasks, "task", TaskOut)
     return task_update
 
 
@@ -91,4 +111,9 @@ def delete_task_progress_update(
             status_code=status.HTTP_403_FORBIDDEN,
             detail={"message": "You cannot delete this task progress update."},
         )
+    task = rollups.progress_deleted(db, progress_id, progress_update.task_id)
+    cache_keys = task_keys(task.id, task.project_id)
+    bump_versions(db, task_ids=[task.id], project_ids=[task.project_id])
     delete_item(progress_id, db, TaskProgressInfo, "task_progress_update")
+    invalidate(cache_keys)
+    reindex(db, "progress", progress_id)
@@ -1,22 +1,70 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    status,
+    HTTPException,
+    Query,
+    Response,
+    Header,
+)
+from pydantic import BaseModel, ValidationError
+from typing import Annotated, Any, Literal
 from ..database import db_session
 from sqlalchemy.orm import Session
 from ..models import Tasks, Projects
-from ..schemas import TaskIn, TaskOut
+from ..schemas import TaskIn, TaskOut, DateQuery
+from ..search import reindex, unindex
 from ..authenticate import get_current_user
 from ..util import (
+    bulk_create_new_items,
     create_new_item,
-    get_all_items,
+    csv_rows,
+    get_page_of_items,
     get_item_by_id,
     update_item,
     delete_item,
     is_user_allowed,
+    start_end_date_error,
+    validation_messages,
     verify_start_end_date,
 )
+from ..cache import get_cached_item_by_id, entity_keys, invalidate, task_keys
+from ..serializers import json_response
+from ..fieldsets import fieldset
+from ..etags import (
+    bump_versions,
+    conditional_response,
+    etag_matches,
+    get_page_etag,
+    not_modified,
+    set_etag,
+)
+from .. import rollups
 
 router = APIRouter(tags=["Tasks"])
 
 
+def task_filters(
+    project_id: int | None = None,
+    status_filter: (
+        Literal["in progress", "completed", "suspended", "cancelled"] | None
+    ) = Query(default=None, alias="status"),
+    enddate_from: Annotated[DateQuery, Query(examples=["10-12-2024"])] = None,
+    enddate_to: Annotated[DateQuery, Query(examples=["10-02-2025"])] = None,
+) -> list:
+    filters = []
+    if project_id is not None:
+        filters.append(Tasks.project_id == project_id)
+    if status_filter:
+        filters.append(Tasks.status == status_filter)
+    if enddate_from:
+        filters.append(Tasks.enddate >= enddate_from)
+    if enddate_to:
+        filters.append(Tasks.enddate <= enddate_to)
+    return filters
+
+
 @router.post(
     "/projects/{project_id}/tasks",
     response_model=TaskOut,
@@ -41,30 +89,129 @@ def add_task_to_project(
         )
     task_dict = task.model_dump()
     task_dict.update({"project_id": project_id})
-    task = create_new_item(task_dict, db, Tasks)
-    return task
+    task = create_new_item(task_dict, db, Tasks, commit=False)
+    rollups.task_added(db, task)
+    bump_versions(db, project_ids=[project_id])
+    db.commit()
+    invalidate(entity_keys(Projects, project_id))
+    reindex(db, "task", task.id)
+    return get_item_by_id(task.id, db, Tasks, "task", TaskOut)
+
+
+@router.post(
+    "/projects/{project_id}/tasks/bulk",
+    status_code=status.HTTP_201_CREATED,
+    description="This endpoint can only be accessed by the admin who created the project. It adds many tasks to the project in a single transaction. The body is either a JSON array of tasks or CSV text (`Content-Type: text/csv`) with a header row of `name,status,description,startdate,enddate`. Every row is validated like a single task, including the start and end dates against the project. If any row is invalid nothing is imported and the response lists the errors of each invalid row by its row number.",
+)
+def import_tasks_to_project(
+    project_id: int,
+    tasks: list[Any] | str = Body(
+        examples=[
+            [
+                {
+                    "name": "Frontend Dev",
+                    "status": "in progress",
+                    "description": "the task is about...",
+                    "startdate": "10-12-2024",
+                    "enddate": "10-02-2025",
+                }
+            ]
+        ]
+    ),
+    user: dict = Depends(get_current_user),
+    db: Session = Depends(db_session),
+):
+    is_user_allowed(user_role=user.get("role"), endpoint_allowed_role="admin")
+    project = get_item_by_id(project_id, db, Projects, "project")
+    if user.get("id") != project.admin_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "message": f"Only the admin with id {project.admin_id} can add tasks to this project."
+            },
+        )
+    rows = csv_rows(tasks) if isinstance(tasks, str) else tasks
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "No tasks were provided."},
+        )
+    valid_tasks = []
+    errors = []
+    for row_number, row in enumerate(rows, start=1):
+        try:
+            task = TaskIn.model_validate(row)
+        except ValidationError as error:
+            errors.append({"row": row_number, "errors": validation_messages(error)})
+            continue
+        message = start_end_date_error(project, task.startdate, task.enddate)
+        if message:
+            errors.append({"row": row_number, "errors": [message]})
+            continue
+        valid_tasks.append(task.model_dump() | {"project_id": project_id})
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "message": f"{len(errors)} of {len(rows)} tasks are invalid, no tasks were imported.",
+                "errors": errors,
+            },
+        )
+    created = bulk_create_new_items(valid_tasks, db, Tasks, [Tasks.id], commit=False)
+    rollups.tasks_imported(db, project_id, len(created))
+    bump_versions(db, project_ids=[project_id])
+    db.commit()
+    invalidate(entity_keys(Projects, project_id))
+    reindex(db, "task", *(task_id for (task_id,) in created))
+    return {
+        "message": f"{len(created)} tasks were successfully added to project {project_id}",
+        "task_ids": [task_id for (task_id,) in created],
+    }
 
 
 @router.get(
     "/tasks",
     response_model=list[TaskOut],
     dependencies=[Depends(get_current_user)],
-    description="This endpoint ensures users are authenticated before they can view all created tasks.",
+    description="This endpoint ensures users are authenticated before they can view the created tasks. Results are ordered by id and returned in pages of at most `limit` tasks. When more tasks are available, the `X-Next-Cursor` response header holds the cursor to pass back to fetch the next page. Tasks can be filtered by project, status and end date range (dates in dd-mm-yyyy format). Every page carries an `ETag`; sending it back in `If-None-Match` returns `304 Not Modified` while the page is unchanged.",
 )
-def get_all_tasks(db: Session = Depends(db_session)):
-    all_tasks = get_all_items(db, Tasks)
-    return all_tasks
+def get_all_tasks(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list = Depends(task_filters),
+    schema: type[BaseModel] = Depends(fieldset(TaskOut)),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(db_session),
+):
+    etag = get_page_etag(db, Tasks, limit, cursor, filters, schema)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    all_tasks, next_cursor = get_page_of_items(
+        db, Tasks, limit, cursor, filters, schema
+    )
+    set_etag(response, etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(all_tasks, list[schema], response.headers)
 
 
 @router.get(
     "/tasks/{task_id}",
     response_model=TaskOut,
     dependencies=[Depends(get_current_user)],
-    description="This endpoint ensures users are authenticated before they can view a specific tasks.",
+    description="This endpoint ensures users are authenticated before they can view a specific tasks. The response carries an `ETag`; sending it back in `If-None-Match` returns `304 Not Modified` while the task, its assignments and progress updates are unchanged.",
 )
-def get_task_by_id(task_id: int, db: Session = Depends(db_session)):
-    task = get_item_by_id(task_id, db, Tasks, "task")
-    return task
+def get_task_by_id(
+    task_id: int,
+    schema: type[BaseModel] = Depends(fieldset(TaskOut)),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(db_session),
+):
+    etag, task = get_cached_item_by_id(
+        task_id, db, Tasks, "task", schema, if_none_match
+    )
+    return conditional_response(task, etag, if_none_match)
 
 
 @router.put(
@@ -91,7 +238,12 @@ def update_task(
                 "message": f"Only the admin with id {project.admin_id} can update this task."
             },
         )
-    updated_task = update_item(task_id, task_in.model_dump(), db, Tasks, "task")
+    bump_versions(db, task_ids=[task_id], project_ids=[project_id])
+    updated_task = update_item(
+        task_id, task_in.model_dump(), db, Tasks, "task", schema=TaskOut
+    )
+    invalidate(task_keys(task_id, project_id))
+    reindex(db, "task", task_id)
     return updated_task
 
 
@@ -116,4 +268,8 @@ def delete_task(
                 "message": f"Only the admin with id {project.admin_id} can delete this task."
             },
         )
+    rollups.task_deleted(db, task)
+    bump_versions(db, project_ids=[project_id])
     delete_item(task_id, db, Tasks, "task")
+    invalidate(task_keys(task_id, project_id))
+    unindex(task_ids=[task_id])
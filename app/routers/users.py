@@ -1,22 +1,41 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Query, Response
+from typing import Literal
+from pydantic import BaseModel
 from ..database import db_session
 from sqlalchemy.orm import Session
 from ..authenticate import HashVerifyPassword, get_current_user
-from ..schemas import UserIn, UserOut
-from ..models import Users
+from sqlalchemy import select
+from ..schemas import UserIn, UserOut, UserTaskOut
+from ..models import AssignUserTask, Projects, Tasks, Users
+from ..cache import invalidate, related_keys, user_related_ids
+from ..search import unindex
+from ..etags import bump_versions
+from ..serializers import json_response
+from ..fieldsets import fieldset
 from ..util import (
     create_new_item,
-    get_all_items,
+    date_page_filters,
+    split_date_page,
+    get_page_of_items,
     get_item_by_id,
     update_item,
     delete_item,
     is_user_allowed,
 )
 
+from .tasks import task_filters
+
 hash_password = HashVerifyPassword()
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
+def user_filters(role: Literal["admin", "user", "guest"] | None = None) -> list:
+    filters = []
+    if role:
+        filters.append(Users.role == role)
+    return filters
+
+
 @router.post(
     "/",
     response_model=UserOut,
@@ -25,22 +44,29 @@ router = APIRouter(prefix="/users", tags=["Users"])
 )
 def add_user(user: UserIn, db: Session = Depends(db_session)):
     user.password = hash_password.hash_password(user.password)
-    user = create_new_item(user.model_dump(), db, Users)
+    user = create_new_item(user.model_dump(), db, Users, schema=UserOut)
     return user
 
 
 @router.get(
     "/",
     response_model=list[UserOut],
-    description="This endpoint allows admin to query all users in the database. The endpoint can only be accessed by the admins after they have been authenticated successfully.",
+    description="This endpoint allows admin to query the users in the database. The endpoint can only be accessed by the admins after they have been authenticated successfully. Results are ordered by id and returned in pages of at most `limit` users. When more users are available, the `X-Next-Cursor` response header holds the cursor to pass back to fetch the next page. Users can be filtered by role.",
 )
 def get_all_users(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list = Depends(user_filters),
+    schema: type[BaseModel] = Depends(fieldset(UserOut)),
     user: dict = Depends(get_current_user),
     db: Session = Depends(db_session),
 ):
     is_user_allowed(user_role=user.get("role"), endpoint_allowed_role="admin")
-    users = get_all_items(db, Users)
-    return users
+    users, next_cursor = get_page_of_items(db, Users, limit, cursor, filters, schema)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(users, list[schema], response.headers)
 
 
 @router.get(
@@ -49,11 +75,56 @@ def get_all_users(
     description="This endpoint is used to get current user profile. This endpoint gives the user an overview of their profile, and can only be accessed after being authenticated.",
 )
 def get_current_user_profile(
+    schema: type[BaseModel] = Depends(fieldset(UserOut)),
     user: dict = Depends(get_current_user),
     db: Session = Depends(db_session),
 ):
-    user = get_item_by_id(user.get("id"), db, Users, "user")
-    return user
+    user = get_item_by_id(user.get("id"), db, Users, "user", schema)
+    return json_response(user, schema)
+
+
+def user_tasks_statement(
+    user_id: int, limit: int, cursor: str | None = None, filters: list | None = None
+):
+    statement = (
+        select(
+            Tasks.id,
+            Tasks.name,
+            Tasks.status,
+            Tasks.description,
+            Tasks.startdate,
+            Tasks.enddate,
+            Tasks.progress_score,
+            Tasks.project_id,
+            Projects.name.label("project_name"),
+            Projects.status.label("project_status"),
+        )
+        .join(AssignUserTask, AssignUserTask.task_id == Tasks.id)
+        .join(Projects, Projects.id == Tasks.project_id)
+        .where(AssignUserTask.user_id == user_id, *(filters or []))
+    )
+    statement = statement.where(*date_page_filters(Tasks, Tasks.enddate, cursor))
+    return statement.order_by(Tasks.enddate, Tasks.id).limit(limit + 1)
+
+
+@router.get(
+    "/me/tasks",
+    response_model=list[UserTaskOut],
+    description="This endpoint lists the tasks assigned to the authenticated user together with the name and status of their project, ordered by end date. Tasks can be filtered by project, status and end date range (dates in dd-mm-yyyy format). Results are returned in pages of at most `limit` tasks. When more tasks are available, the `X-Next-Cursor` response header holds the cursor to pass back to fetch the next page.",
+)
+def get_current_user_tasks(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list = Depends(task_filters),
+    user: dict = Depends(get_current_user),
+    db: Session = Depends(db_session),
+):
+    statement = user_tasks_statement(user.get("id"), limit, cursor, filters)
+    tasks, next_cursor = split_date_page(db.execute(statement).all(), limit, "enddate")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return json_response(tasks, list[UserTaskOut], response.headers)
 
 
 @router.get(
@@ -63,12 +134,13 @@ def get_current_user_profile(
 )
 def get_user(
     user_id: int,
+    schema: type[BaseModel] = Depends(fieldset(UserOut)),
     user: dict = Depends(get_current_user),
     db: Session = Depends(db_session),
 ):
     is_user_allowed(user_role=user.get("role"), endpoint_allowed_role="admin")
-    user = get_item_by_id(user_id, db, Users, "user")
-    return user
+    user = get_item_by_id(user_id, db, Users, "user", schema)
+    return json_response(user, schema)
 
 
 @router.put(
@@ -84,7 +156,12 @@ def update_user_info(
 ):
     user_id = user.get("id")
     user_info.password = hash_password.hash_password(user_info.password)
-    user = update_item(user_id, user_info.model_dump(), db, Users, "user")
+    task_ids, project_ids = user_related_ids(db, user_id)
+    bump_versions(db, task_ids, project_ids)
+    user = update_item(
+        user_id, user_info.model_dump(), db, Users, "user", schema=UserOut
+    )
+    invalidate(related_keys(task_ids, project_ids))
     return user
 
 
@@ -99,4 +176,12 @@ def delete_user(
     db: Session = Depends(db_session),
 ):
     is_user_allowed(user_role=user.get("role"), endpoint_allowed_role="admin")
+    task_ids, project_ids = user_related_ids(db, user_id)
+    created_project_ids = [
+        project_id
+        for (project_id,) in db.query(Projects.id).filter(Projects.admin_id == user_id)
+    ]
+    bump_versions(db, task_ids, project_ids)
     delete_item(user_id, db, Users, "user")
+    invalidate(related_keys(task_ids, project_ids))
+    unindex(project_ids=created_project_ids)
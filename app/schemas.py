@@ -10,6 +10,8 @@ from pydantic import (
     field_validator,
 )
 
+DateQuery = Annotated[date | None, BeforeValidator(str_to_datetime)]
+
 
 class UserAssignInfo(BaseModel):
     project_id: int
@@ -89,6 +91,7 @@ class TaskOut(Task):
     project_id: int
     startdate: date
     enddate: date
+    progress_score: int
     assigned_users: list[TaskUser]
     task_progress_detail: list[ProgressOut]
 
@@ -96,6 +99,19 @@ class TaskOut(Task):
         from_attributes = True
 
 
+class UserTaskOut(BaseModel):
+    id: int
+    name: str
+    status: str
+    description: str | None
+    startdate: date
+    enddate: date
+    progress_score: int
+    project_id: int
+    project_name: str
+    project_status: str
+
+
 class Project(BaseModel):
     name: str = Field(examples=["Website frontend and backend development"])
     description: str = Field(examples=["This project is about..."])
@@ -128,6 +144,7 @@ class ProjectOut(Project):
     deadline: date
     date_created: date
     progress_score: int
+    task_progress: float
     project_tasks: list[TaskOut]
 
     class ConfigDict:
@@ -172,3 +189,41 @@ class UserOut(User):
     id: int
     created_projects: list[ProjectUserOut]
     assigned_tasks: list[UserTask]
+
+
+class TokenRefreshIn(BaseModel):
+    refresh_token: str
+
+
+class TokenOut(BaseModel):
+    access_token: str
+    token_type: str = Field(examples=["bearer"])
+    expires_in: int = Field(examples=[900])
+    refresh_token: str
+
+
+class SearchResultOut(BaseModel):
+    type: Literal["project", "task", "progress"]
+    id: int
+    title: str
+    project_id: int
+    task_id: int | None
+    rank: float
+
+
+class ProgressPointOut(BaseModel):
+    date: date
+    progress_score: float
+    updates: int
+
+
+class TaskProgressSeriesOut(BaseModel):
+    task_id: int
+    points: list[ProgressPointOut]
+
+
+class ProjectProgressSeriesOut(BaseModel):
+    project_id: int
+    interval: Literal["day", "week"]
+    project: list[ProgressPointOut]
+    tasks: list[TaskProgressSeriesOut]
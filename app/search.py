@@ -0,0 +1,225 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from sqlalchemy import func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+from .models import Projects, Tasks, TaskProgressInfo
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SEARCH_CONFIG = "english"
+SEARCH_INDEX_SYNC_SECONDS = float(os.getenv("SEARCH_INDEX_SYNC_SECONDS", "300"))
+
+
+def text_vector(*columns):
+    document = func.coalesce(columns[0], "")
+    for column in columns[1:]:
+        document = document + " " + func.coalesce(column, "")
+    return func.to_tsvector(SEARCH_CONFIG, document)
+
+
+sources = {
+    "project": (
+        select(
+            Projects.id,
+            Projects.name.label("title"),
+            Projects.id.label("project_id"),
+            null().label("task_id"),
+        ),
+        text_vector(Projects.name, Projects.description),
+        [Projects.name, Projects.description],
+        select(func.count(), func.max(Projects.id), func.sum(Projects.version)),
+    ),
+    "task": (
+        select(
+            Tasks.id,
+            Tasks.name.label("title"),
+            Tasks.project_id,
+            Tasks.id.label("task_id"),
+        ),
+        text_vector(Tasks.name, Tasks.description),
+        [Tasks.name, Tasks.description],
+        select(func.count(), func.max(Tasks.id), func.sum(Tasks.version)),
+    ),
+    "progress": (
+        select(
+            TaskProgressInfo.id,
+            TaskProgressInfo.comment.label("title"),
+            Tasks.project_id,
+            TaskProgressInfo.task_id,
+        ).join(Tasks, Tasks.id == TaskProgressInfo.task_id),
+        text_vector(TaskProgressInfo.comment),
+        [TaskProgressInfo.comment],
+        select(
+            func.count(),
+            func.max(TaskProgressInfo.id),
+            select(func.sum(Tasks.version)).scalar_subquery(),
+        ),
+    ),
+}
+
+
+def postgres_search(
+    db: Session, text: str, kinds: list[str], limit: int, offset: int
+) -> list[dict]:
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+    statements = []
+    for kind in kinds:
+        statement, vector, _, _ = sources[kind]
+        statements.append(
+            statement.add_columns(
+                literal(kind).label("type"), func.ts_rank(vector, query).label("rank")
+            ).where(vector.op("@@")(query))
+        )
+    results = union_all(*statements).subquery()
+    statement = (
+        select(results)
+        .order_by(results.c.rank.desc(), results.c.type, results.c.id)
+        .offset(offset)
+        .limit(limit + 1)
+    )
+    return [row._asdict() for row in db.execute(statement)]
+
+
+def tokenize(text: str | None) -> list[str]:
+    return re.findall(r"\w+", (text or "").lower())
+
+
+class InvertedIndex:
+    def __init__(self, sync_seconds: float):
+        self.sync_seconds = sync_seconds
+        self.lock = threading.RLock()
+        self.signatures: dict[str, tuple] = {}
+        self.synced_at: dict[str, float] = {}
+        self.documents: dict[str, dict[int, tuple]] = {}
+        self.postings: dict[str, dict[str, dict[int, int]]] = {}
+
+    @staticmethod
+    def document(row) -> tuple:
+        terms = Counter(term for column in row[4:] for term in tokenize(column))
+        return (row.title, row.project_id, row.task_id, terms)
+
+    def sync(self, db: Session, kind: str) -> None:
+        synced_at = self.synced_at.get(kind)
+        if synced_at is not None and time.monotonic() < synced_at + self.sync_seconds:
+            return
+        statement, _, columns, signature_statement = sources[kind]
+        with self.lock:
+            signature = tuple(db.execute(signature_statement).one())
+            self.synced_at[kind] = time.monotonic()
+            if self.signatures.get(kind) == signature:
+                return
+            documents = {}
+            postings: dict[str, dict[int, int]] = {}
+            for row in db.execute(statement.add_columns(*columns)):
+                document = self.document(row)
+                documents[row.id] = document
+                for term, count in document[3].items():
+                    postings.setdefault(term, {})[row.id] = count
+            self.documents[kind] = documents
+            self.postings[kind] = postings
+            self.signatures[kind] = signature
+
+    def update(self, kind: str, rows: list, removed_ids=()) -> None:
+        with self.lock:
+            documents = self.documents.get(kind)
+            if documents is None:
+                return
+            postings = self.postings[kind]
+            changed: dict[str, dict[int, int]] = {}
+
+            def posting(term: str) -> dict[int, int]:
+                if term not in changed:
+                    changed[term] = dict(postings.get(term, {}))
+                return changed[term]
+
+            for id in removed_ids:
+                document = documents.pop(id, None)
+                for term in document[3] if document else ():
+                    posting(term).pop(id, None)
+            for row in rows:
+                previous = documents.get(row.id)
+                for term in previous[3] if previous else ():
+                    posting(term).pop(row.id, None)
+                document = self.document(row)
+                for term, count in document[3].items():
+                    posting(term)[row.id] = count
+                documents[row.id] = document
+            for term, entries in changed.items():
+                if entries:
+                    postings[term] = entries
+                else:
+                    postings.pop(term, None)
+
+    def remove(self, project_ids: set[int], task_ids: set[int]) -> None:
+        with self.lock:
+            for kind, documents in self.documents.items():
+                removed_ids = [
+                    id
+                    for id, (_, project_id, task_id, _) in documents.items()
+                    if project_id in project_ids or task_id in task_ids
+                ]
+                self.update(kind, [], removed_ids)
+
+    def search(self, db: Session, text: str, kinds: list[str]) -> list[dict]:
+        terms = set(tokenize(text))
+        results = []
+        for kind in kinds:
+            self.sync(db, kind)
+            if not terms:
+                continue
+            documents = self.documents[kind]
+            postings_by_term = self.postings[kind]
+            postings = [postings_by_term.get(term, {}) for term in terms]
+            matches = set.intersection(*(set(posting) for posting in postings))
+            for id in matches:
+                document = documents.get(id)
+                if document is None:
+                    continue
+                title, project_id, task_id, document_terms = document
+                length = document_terms.total()
+                rank = sum(
+                    posting[id] / length * math.log(1 + len(documents) / len(posting))
+                    for posting in postings
+                )
+                results.append(
+                    {
+                        "type": kind,
+                        "id": id,
+                        "title": title,
+                        "project_id": project_id,
+                        "task_id": task_id,
+                        "rank": rank,
+                    }
+                )
+        return sorted(
+            results, key=lambda result: (-result["rank"], result["type"], result["id"])
+        )
+
+
+search_index = InvertedIndex(SEARCH_INDEX_SYNC_SECONDS)
+
+
+def reindex(db: Session, kind: str, *ids: int) -> None:
+    if kind not in search_index.documents or not ids:
+        return
+    statement, _, columns, _ = sources[kind]
+    id_column = statement.selected_columns[0]
+    rows = db.execute(statement.add_columns(*columns).where(id_column.in_(ids))).all()
+    search_index.update(kind, rows, set(ids) - {row.id for row in rows})
+
+
+def unindex(project_ids=(), task_ids=()) -> None:
+    search_index.remove(set(project_ids), set(task_ids))
+
+
+def search_items(
+    db: Session, text: str, kinds: list[str], limit: int, offset: int = 0
+) -> list[dict]:
+    if db.get_bind().dialect.name == "postgresql":
+        return postgres_search(db, text, kinds, limit, offset)
+    return search_index.search(db, text, kinds)[offset : offset + limit + 1]
@@ -0,0 +1,358 @@
+import argparse
+import csv
+import io
+import math
+import random
+import time
+from bisect import bisect
+from datetime import date, timedelta
+from itertools import accumulate
+from sqlalchemy import text
+from .database import engine
+from .models import utc_now
+from .passwords import hash_password
+
+# fmt: off
+FIRST_NAMES = [
+    "Ada", "Bola", "Chen", "Dara", "Emeka", "Fatima", "Grace", "Hiro", "Ines",
+    "Jamal", "Kemi", "Lena", "Mateo", "Nia", "Omar", "Priya", "Quinn", "Rosa",
+    "Sade", "Tariq", "Uche", "Vera", "Wale", "Xin", "Yara", "Zane",
+]
+LAST_NAMES = [
+    "Adeyemi", "Brown", "Costa", "Diallo", "Eze", "Fischer", "Garcia", "Haddad",
+    "Ibrahim", "Jensen", "Kim", "Lopez", "Mensah", "Nakamura", "Okafor", "Patel",
+    "Rossi", "Silva", "Tanaka", "Umeh", "Varga", "Williams", "Yilmaz", "Zhou",
+]
+WORDS = [
+    "api", "billing", "checkout", "dashboard", "design", "docs", "frontend",
+    "backend", "gateway", "invoice", "login", "migration", "mobile", "onboarding",
+    "payment", "reports", "search", "security", "testing", "upload",
+]
+
+tables = {
+    "users": ["id", "firstname", "lastname", "email", "password", "role"],
+    "projects": [
+        "id", "admin_id", "name", "description", "date_created", "deadline",
+        "progress_score", "status", "task_count", "task_progress_total",
+        "updated_at",
+    ],
+    "tasks": [
+        "id", "project_id", "name", "description", "status", "startdate",
+        "enddate", "progress_score", "latest_progress_id", "updated_at",
+    ],
+    "assigntask": ["id", "task_id", "user_id"],
+    "progress": [
+        "id", "task_id", "user_id", "date_updated", "comment", "progress_score",
+        "updated_at",
+    ],
+    "progress_daily": [
+        "id", "task_id", "project_id", "day", "updates", "progress_score",
+        "latest_progress_id",
+    ],
+}
+# fmt: on
+
+
+def skewed(rng: random.Random, mean: float, minimum: int = 0) -> int:
+    if mean <= 0:
+        return minimum
+    sigma = 0.8
+    value = rng.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+    return max(minimum, round(value))
+
+
+def random_day(rng: random.Random, start: date, end: date) -> date:
+    return start + timedelta(days=rng.randint(0, max((end - start).days, 0)))
+
+
+def status_for(rng: random.Random, due: date, today: date) -> str:
+    if due < today:
+        return rng.choices(["completed", "in progress", "cancelled"], [70, 20, 10])[0]
+    return rng.choices(["in progress", "suspended", "completed"], [75, 15, 10])[0]
+
+
+class TableWriter:
+    def __init__(self, connection, table: str):
+        self.connection = connection
+        self.table = table
+        self.columns = tables[table]
+        self.rows = 0
+        self.copy = engine.dialect.driver == "psycopg2"
+        if engine.dialect.paramstyle in ("format", "pyformat"):
+            placeholders = ", ".join(["%s"] * len(self.columns))
+        else:
+            placeholders = ", ".join(["?"] * len(self.columns))
+        self.statement = (
+            f"INSERT INTO {table} ({', '.join(self.columns)}) VALUES ({placeholders})"
+        )
+
+    def write(self, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        cursor = self.connection.cursor()
+        if self.copy:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {self.table} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        else:
+            cursor.executemany(self.statement, rows)
+        cursor.close()
+        self.rows += len(rows)
+
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.today = date.today()
+        self.now = utc_now()
+        self.buffers = {table: [] for table in tables}
+        self.next_id = dict.fromkeys(tables, 1)
+
+    def new_id(self, table: str) -> int:
+        id = self.next_id[table]
+        self.next_id[table] = id + 1
+        return id
+
+    def users(self, password: str):
+        rng = self.rng
+        admins, members = [], []
+        for id in range(1, self.args.users + 1):
+            role = rng.choices(["admin", "user", "guest"], [2, 93, 5])[0]
+            if id == 1:
+                role = "admin"
+            if role == "admin":
+                admins.append(id)
+            elif role == "user":
+                members.append(id)
+            self.buffers["users"].append(
+                (
+                    id,
+                    rng.choice(FIRST_NAMES),
+                    rng.choice(LAST_NAMES),
+                    f"user{id}@example.com",
+                    password,
+                    role,
+                )
+            )
+        self.next_id["users"] = self.args.users + 1
+        rng.shuffle(members)
+        self.admins = admins
+        self.members = members
+        self.member_weights = list(
+            accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(members)))
+        )
+
+    def pick_members(self, count: int) -> list[int]:
+        if not self.members or count <= 0:
+            return []
+        total = self.member_weights[-1]
+        chosen = set()
+        for _ in range(count * 2):
+            index = bisect(self.member_weights, self.rng.random() * total)
+            chosen.add(self.members[min(index, len(self.members) - 1)])
+            if len(chosen) == count:
+                break
+        return list(chosen)
+
+    def phrase(self, words: int) -> str:
+        return " ".join(self.rng.choices(WORDS, k=words))
+
+    def project(self):
+        rng, today, args = self.rng, self.today, self.args
+        project_id = self.new_id("projects")
+        date_created = today - timedelta(days=rng.randint(0, args.history_days))
+        deadline = date_created + timedelta(days=rng.randint(30, 365))
+        task_count = skewed(rng, args.tasks_per_project)
+        progress_total = 0
+        for _ in range(task_count):
+            progress_total += self.task(project_id, date_created, deadline)
+        self.buffers["projects"].append(
+            (
+                project_id,
+                rng.choice(self.admins),
+                f"{self.phrase(2).title()} project {project_id}",
+                f"Deliver the {self.phrase(3)} work.",
+                date_created,
+                deadline,
+                round(progress_total / task_count) if task_count else 0,
+                status_for(rng, deadline, today),
+                task_count,
+                progress_total,
+                self.now,
+            )
+        )
+
+    def task(self, project_id: int, project_start: date, deadline: date) -> int:
+        rng, today = self.rng, self.today
+        task_id = self.new_id("tasks")
+        startdate = random_day(rng, project_start, deadline - timedelta(days=1))
+        enddate = random_day(rng, startdate + timedelta(days=1), deadline)
+        status = status_for(rng, enddate, today)
+        assigned = self.pick_members(skewed(rng, self.args.users_per_task, 1))
+        for user_id in assigned:
+            self.buffers["assigntask"].append(
+                (self.new_id("assigntask"), task_id, user_id)
+            )
+        score, latest_progress_id = self.updates(
+            task_id, project_id, startdate, min(enddate, today), status, assigned
+        )
+        self.buffers["tasks"].append(
+            (
+                task_id,
+                project_id,
+                f"{self.phrase(2).capitalize()} {task_id}",
+                f"Work on the {self.phrase(3)}.",
+                status,
+                startdate,
+                enddate,
+                score,
+                latest_progress_id,
+                self.now,
+            )
+        )
+        return score
+
+    def updates(self, task_id, project_id, start, end, status, assigned):
+        rng = self.rng
+        if end < start:
+            return 0, None
+        count = skewed(rng, self.args.updates_per_task)
+        if not count:
+            return 0, None
+        final = 100 if status == "completed" else rng.randint(5, 95)
+        scores = sorted(rng.randint(0, final) for _ in range(count - 1)) + [final]
+        days = sorted(random_day(rng, start, end) for _ in range(count))
+        authors = assigned or [self.admins[0]]
+        daily = None
+        progress_id = None
+        for day, score in zip(days, scores):
+            progress_id = self.new_id("progress")
+            self.buffers["progress"].append(
+                (
+                    progress_id,
+                    task_id,
+                    rng.choice(authors),
+                    day,
+                    f"Worked on the {self.phrase(2)}.",
+                    score,
+                    self.now,
+                )
+            )
+            if daily and daily[3] == day:
+                daily[4] += 1
+                daily[5] = score
+                daily[6] = progress_id
+            else:
+                if daily:
+                    self.buffers["progress_daily"].append(tuple(daily))
+                daily = [
+                    self.new_id("progress_daily"),
+                    task_id,
+                    project_id,
+                    day,
+                    1,
+                    score,
+                    progress_id,
+                ]
+        self.buffers["progress_daily"].append(tuple(daily))
+        return scores[-1], progress_id
+
+    def buffered(self) -> int:
+        return sum(len(rows) for rows in self.buffers.values())
+
+
+def flush(generator: Generator, writers: dict) -> None:
+    for table, writer in writers.items():
+        writer.write(generator.buffers[table])
+        generator.buffers[table] = []
+
+
+def seed(args) -> dict:
+    start = time.perf_counter()
+    generator = Generator(args)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("SELECT COUNT(*) FROM users")
+        if cursor.fetchone()[0]:
+            raise SystemExit(
+                "The users table is not empty; seed into an empty, migrated database."
+            )
+        cursor.close()
+        writers = {table: TableWriter(raw, table) for table in tables}
+        generator.users(hash_password(args.password))
+        for _ in range(args.projects):
+            generator.project()
+            if generator.buffered() >= args.batch_size:
+                flush(generator, writers)
+        flush(generator, writers)
+        raw.commit()
+    finally:
+        raw.close()
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            for table in tables:
+                connection.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                    )
+                )
+        with engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            connection.execute(text("ANALYZE"))
+    counts = {table: writer.rows for table, writer in writers.items()}
+    counts["seconds"] = time.perf_counter() - start
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fill an empty, migrated database (DB_URL) with synthetic users, projects, tasks, assignments and progress updates."
+    )
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument(
+        "--tasks-per-project",
+        type=float,
+        default=20,
+        help="Mean tasks per project.",
+    )
+    parser.add_argument(
+        "--users-per-task", type=float, default=2.5, help="Mean users per task."
+    )
+    parser.add_argument(
+        "--updates-per-task",
+        type=float,
+        default=5,
+        help="Mean progress updates per task.",
+    )
+    parser.add_argument(
+        "--history-days",
+        type=int,
+        default=730,
+        help="How far back project start dates go.",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--password",
+        default="password",
+        help="Password shared by every generated user; hashed once.",
+    )
+    parser.add_argument("--batch-size", type=int, default=100000)
+    args = parser.parse_args()
+    counts = seed(args)
+    seconds = counts.pop("seconds")
+    total = sum(counts.values())
+    print(", ".join(f"{count} {table}" for table, count in counts.items()))
+    print(f"{total} rows in {seconds:.1f} s ({total / seconds:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
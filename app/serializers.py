@@ -0,0 +1,23 @@
+from functools import lru_cache
+from fastapi import Response
+from pydantic import TypeAdapter
+from .metrics import timed
+
+
+@lru_cache(maxsize=1024)
+def type_adapter(annotation) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def dump_json(content, annotation) -> bytes:
+    adapter = type_adapter(annotation)
+    with timed("serialize"):
+        return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def json_response(content, annotation, headers=None) -> Response:
+    return Response(
+        content=dump_json(content, annotation),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,107 @@
+from bisect import bisect_right
+from datetime import date, timedelta
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+from .models import Projects, TaskProgressDaily, Tasks
+
+
+def bucket_start(day: date, interval: str) -> date:
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def bucket_end(day: date, interval: str) -> date:
+    if interval == "week":
+        return day + timedelta(days=6)
+    return day
+
+
+def task_startdates(db: Session, project_id: int) -> dict[int, date]:
+    rows = db.query(Tasks.id, Tasks.startdate).filter(Tasks.project_id == project_id)
+    return {task_id: startdate for task_id, startdate in rows}
+
+
+def tasks_started(
+    startdates: dict[int, date], sorted_starts: list[date], scores: dict, last: date
+) -> int:
+    early = sum(startdates.get(task_id, last) > last for task_id in scores)
+    return bisect_right(sorted_starts, last) + early
+
+
+def opening_scores(db: Session, project_id: int, before: date) -> dict[int, int]:
+    latest = (
+        db.query(
+            TaskProgressDaily.task_id, func.max(TaskProgressDaily.day).label("day")
+        )
+        .filter(
+            TaskProgressDaily.project_id == project_id, TaskProgressDaily.day < before
+        )
+        .group_by(TaskProgressDaily.task_id)
+        .subquery()
+    )
+    rows = (
+        db.query(TaskProgressDaily.task_id, TaskProgressDaily.progress_score)
+        .join(
+            latest,
+            and_(
+                TaskProgressDaily.task_id == latest.c.task_id,
+                TaskProgressDaily.day == latest.c.day,
+            ),
+        )
+        .all()
+    )
+    return {task_id: progress_score for task_id, progress_score in rows}
+
+
+def progress_timeseries(
+    db: Session,
+    project: Projects,
+    interval: str = "day",
+    start: date | None = None,
+    end: date | None = None,
+) -> dict:
+    query = db.query(TaskProgressDaily).filter(
+        TaskProgressDaily.project_id == project.id
+    )
+    scores: dict[int, int] = {}
+    if start:
+        first_bucket = bucket_start(start, interval)
+        query = query.filter(TaskProgressDaily.day >= first_bucket)
+        scores = opening_scores(db, project.id, first_bucket)
+    if end:
+        query = query.filter(TaskProgressDaily.day <= end)
+    rows = query.order_by(TaskProgressDaily.day, TaskProgressDaily.task_id).all()
+    startdates = task_startdates(db, project.id)
+    sorted_starts = sorted(startdates.values())
+    buckets: dict[date, dict[int, dict]] = {}
+    for row in rows:
+        bucket = buckets.setdefault(bucket_start(row.day, interval), {})
+        point = bucket.setdefault(row.task_id, {"progress_score": 0, "updates": 0})
+        point["progress_score"] = row.progress_score
+        point["updates"] += row.updates
+    project_points = []
+    task_points: dict[int, list] = {}
+    for day, points in buckets.items():
+        for task_id, point in points.items():
+            scores[task_id] = point["progress_score"]
+            task_points.setdefault(task_id, []).append({"date": day, **point})
+        last = bucket_end(day, interval)
+        task_count = tasks_started(startdates, sorted_starts, scores, last)
+        average = sum(scores.values()) / task_count if task_count else 0
+        project_points.append(
+            {
+                "date": day,
+                "progress_score": round(average, 2),
+                "updates": sum(point["updates"] for point in points.values()),
+            }
+        )
+    return {
+        "project_id": project.id,
+        "interval": interval,
+        "project": project_points,
+        "tasks": [
+            {"task_id": task_id, "points": points}
+            for task_id, points in sorted(task_points.items())
+        ],
+    }
@@ -1,32 +1,208 @@
 from fastapi import HTTPException, status
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from .loaders import eager_load_options
 from datetime import datetime, date
+from functools import lru_cache
+import base64
+import csv
+import gzip
+import hashlib
+import io
+import json
 import re
 
 
-def get_item_by_id(id: int, db: Session, Model, item_name: str = "item"):
-    item = db.query(Model).filter(Model.id == id).first()
+def query_items(db: Session, Model, schema=None):
+    query = db.query(Model)
+    if schema is not None:
+        query = query.options(*eager_load_options(Model, schema))
+    return query
+
+
+def select_items(Model, schema=None):
+    statement = select(Model)
+    if schema is not None:
+        statement = statement.options(*eager_load_options(Model, schema))
+    return statement
+
+
+def get_item_by_id(id: int, db: Session, Model, item_name: str = "item", schema=None):
+    item = query_items(db, Model, schema).filter(Model.id == id).first()
     if not item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "message": f"{item_name.capitalize()} with id {id} cannot be found."
-            },
-        )
+        raise_item_not_found(id, item_name)
+    return item
+
+
+async def async_get_item_by_id(
+    id: int, db: AsyncSession, Model, item_name: str = "item", schema=None
+):
+    statement = select_items(Model, schema).where(Model.id == id)
+    item = (await db.scalars(statement)).first()
+    if not item:
+        raise_item_not_found(id, item_name)
     return item
 
 
-def get_all_items(db: Session, Model):
-    items = db.query(Model).all()
+def raise_item_not_found(id: int, item_name: str):
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail={"message": f"{item_name.capitalize()} with id {id} cannot be found."},
+    )
+
+
+def get_all_items(db: Session, Model, schema=None):
+    items = query_items(db, Model, schema).all()
     return items
 
 
-def create_new_item(item_dict: dict, db: Session, Model):
+def encode_cursor(last_id: int, **sort_keys) -> str:
+    raw = json.dumps({"id": last_id, **sort_keys}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def invalid_cursor_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail={"message": "The cursor is invalid."},
+    )
+
+
+def decode_cursor_payload(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(payload["id"], int):
+            raise ValueError("cursor id must be an integer")
+    except Exception:
+        raise invalid_cursor_error()
+    return payload
+
+
+def decode_cursor(cursor: str) -> int:
+    return decode_cursor_payload(cursor)["id"]
+
+
+def decode_date_cursor(cursor: str, key: str) -> tuple[date, int]:
+    payload = decode_cursor_payload(cursor)
+    try:
+        return date.fromisoformat(payload[key]), payload["id"]
+    except Exception:
+        raise invalid_cursor_error()
+
+
+def page_filters(Model, cursor: str | None = None, filters: list | None = None):
+    filters = list(filters or [])
+    if cursor:
+        filters.append(Model.id > decode_cursor(cursor))
+    return filters
+
+
+def get_page_of_items(
+    db: Session,
+    Model,
+    limit: int,
+    cursor: str | None = None,
+    filters: list | None = None,
+    schema=None,
+):
+    query = query_items(db, Model, schema).filter(*page_filters(Model, cursor, filters))
+    items = query.order_by(Model.id).limit(limit + 1).all()
+    return split_page(items, limit)
+
+
+def date_page_filters(Model, date_column, cursor: str | None = None) -> list:
+    if not cursor:
+        return []
+    last_date, last_id = decode_date_cursor(cursor, date_column.key)
+    return [
+        (date_column > last_date) | ((date_column == last_date) & (Model.id > last_id))
+    ]
+
+
+def get_page_of_items_by_date(
+    db: Session,
+    Model,
+    date_column,
+    limit: int,
+    cursor: str | None = None,
+    filters: list | None = None,
+    schema=None,
+):
+    query = query_items(db, Model, schema).filter(
+        *(filters or []), *date_page_filters(Model, date_column, cursor)
+    )
+    items = query.order_by(date_column, Model.id).limit(limit + 1).all()
+    return split_date_page(items, limit, date_column.key)
+
+
+async def async_get_all_items(db: AsyncSession, Model, schema=None):
+    items = (await db.scalars(select_items(Model, schema))).all()
+    return items
+
+
+async def async_get_page_of_items(
+    db: AsyncSession,
+    Model,
+    limit: int,
+    cursor: str | None = None,
+    filters: list | None = None,
+    schema=None,
+):
+    statement = select_items(Model, schema).where(*page_filters(Model, cursor, filters))
+    statement = statement.order_by(Model.id).limit(limit + 1)
+    items = (await db.scalars(statement)).all()
+    return split_page(items, limit)
+
+
+def split_page(items, limit: int):
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].id)
+    return items, next_cursor
+
+
+def split_date_page(items, limit: int, date_key: str):
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(
+            last.id, **{date_key: getattr(last, date_key).isoformat()}
+        )
+    return items, next_cursor
+
+
+def page_version_statement(
+    Model, limit: int, cursor: str | None = None, filters: list | None = None
+):
+    page = (
+        select(Model.id, Model.version)
+        .where(*page_filters(Model, cursor, filters))
+        .order_by(Model.id)
+        .limit(limit + 1)
+        .subquery()
+    )
+    return select(
+        func.count(), func.max(page.c.id), func.coalesce(func.sum(page.c.version), 0)
+    ).select_from(page)
+
+
+def create_new_item(
+    item_dict: dict, db: Session, Model, commit: bool = True, schema=None
+):
     try:
         item = Model(**item_dict)
         db.add(item)
-        db.commit()
-        db.refresh(item)
+        if commit:
+            db.commit()
+            db.refresh(item)
+        else:
+            db.flush()
     except Exception as error:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -34,33 +210,88 @@ def create_new_item(item_dict: dict, db: Session, Model):
                 "\n")[0].split(")")[-1].strip()},
         )
     else:
+        if schema is not None:
+            return get_item_by_id(item.id, db, Model, schema=schema)
         return item
 
 
-def delete_item(id: int, db: Session, Model, item_name: str = "item"):
+def bulk_create_new_items(
+    items: list[dict], db: Session, Model, returning: list, commit: bool = True
+):
+    if not items:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql_insert(Model).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        statement = sqlite_insert(Model).on_conflict_do_nothing()
+    else:
+        statement = insert(Model)
+    statement = statement.returning(*returning)
+    try:
+        created = db.execute(statement, items).all()
+        if commit:
+            db.commit()
+    except Exception as error:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": str(error).split("\n")[0].split(")")[-1].strip()},
+        )
+    else:
+        return created
+
+
+def delete_item(
+    id: int, db: Session, Model, item_name: str = "item", commit: bool = True
+):
     get_item_by_id(id, db, Model, item_name)
     item = db.query(Model).filter(Model.id == id).first()
     db.delete(item)
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        db.flush()
 
 
 def update_item(
-    id: int, update_dict: dict, db: Session, Model, item_name: str = "item"
+    id: int,
+    update_dict: dict,
+    db: Session,
+    Model,
+    item_name: str = "item",
+    commit: bool = True,
+    schema=None,
 ):
     get_item_by_id(id, db, Model, item_name)
     item = db.query(Model).filter(Model.id == id)
     try:
         item.update(update_dict)
-        db.commit()
+        if commit:
+            db.commit()
     except Exception as error:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail={"message": str(error)},
         )
     else:
+        if schema is not None:
+            return get_item_by_id(id, db, Model, item_name, schema)
         return item.first()
 
 
+def csv_rows(text: str) -> list[dict]:
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def validation_messages(error) -> list[str]:
+    messages = []
+    for detail in error.errors():
+        field = ".".join(str(part) for part in detail["loc"])
+        messages.append(f"{field}: {detail['msg']}" if field else detail["msg"])
+    return messages
+
+
 def str_to_datetime(date_str) -> datetime:
     format = "%d-%m-%Y"
     date = datetime.strptime(date_str, format)
@@ -75,22 +306,22 @@ def is_user_allowed(user_role, endpoint_allowed_role: str = "admin") -> None:
         )
 
 
-def verify_start_end_date(item, start: date, end: date):
+def start_end_date_error(item, start: date, end: date) -> str | None:
     proj_startdate = item.date_created
     proj_deadline = item.deadline
     if proj_startdate > start:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail={
-                "message": f"The task start date should not be earlier than the project start date ({proj_startdate})"
-            },
-        )
+        return f"The task start date should not be earlier than the project start date ({proj_startdate})"
     if proj_deadline < end:
+        return f"The task end date should not be later than the project deadline ({proj_deadline})"
+    return None
+
+
+def verify_start_end_date(item, start: date, end: date):
+    message = start_end_date_error(item, start, end)
+    if message:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail={
-                "message": f"The task end date should not be later than the project deadline ({proj_deadline})"
-            },
+            detail={"message": message},
         )
 
 
@@ -262,3 +493,10 @@ def home_page() -> str:
     </html>
     """
     return home
+
+
+@lru_cache(maxsize=1)
+def home_page_content() -> tuple[bytes, bytes, str]:
+    content = home_page().encode()
+    etag = f'"home.{hashlib.sha256(content).hexdigest()[:16]}"'
+    return content, gzip.compress(content, mtime=0), etag
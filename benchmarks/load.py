@@ -0,0 +1,559 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+PASSWORD = "benchmark-password"
+STATUSES = ["in progress", "completed", "suspended", "cancelled"]
+STATUS_WEIGHTS = [60, 25, 10, 5]
+QUERIES = re.compile(r'desc="(\d+) queries"')
+CHUNK_SIZE = 5000
+
+
+def chunks(rows: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def seed_database(args) -> dict:
+    from sqlalchemy import insert, text
+    from app.database import engine
+    from app.models import (
+        AssignUserTask,
+        Projects,
+        TaskProgressDaily,
+        TaskProgressInfo,
+        Tasks,
+        Users,
+    )
+    from app.passwords import hash_password
+
+    rng = random.Random(args.seed)
+    today = date.today()
+    password = hash_password(PASSWORD)
+    users = [
+        {
+            "id": 1,
+            "firstname": "Bench",
+            "lastname": "Admin",
+            "email": "bench-admin@example.com",
+            "password": password,
+            "role": "admin",
+        }
+    ]
+    for id in range(2, args.users + args.clients + 2):
+        users.append(
+            {
+                "id": id,
+                "firstname": "Bench",
+                "lastname": f"User{id}",
+                "email": f"bench-user{id}@example.com",
+                "password": password,
+                "role": "user",
+            }
+        )
+    members = list(range(2, args.users + 1))
+    projects, tasks, assignments, updates, daily = [], [], [], [], {}
+    task_id = 0
+    for project_id in range(1, args.projects + 1):
+        project = {
+            "id": project_id,
+            "admin_id": 1,
+            "name": f"Benchmark project {project_id}",
+            "description": "Seeded by benchmarks.load",
+            "date_created": today - timedelta(days=60),
+            "deadline": today + timedelta(days=365),
+            "progress_score": 0,
+            "status": rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+            "task_count": args.tasks,
+            "task_progress_total": 0,
+        }
+        projects.append(project)
+        for _ in range(args.tasks):
+            task_id += 1
+            startdate = today - timedelta(days=rng.randint(0, 60))
+            task = {
+                "id": task_id,
+                "project_id": project_id,
+                "name": f"Benchmark task {task_id}",
+                "description": "Seeded by benchmarks.load",
+                "status": rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+                "startdate": startdate,
+                "enddate": startdate + timedelta(days=rng.randint(1, 90)),
+                "progress_score": 0,
+                "latest_progress_id": None,
+            }
+            tasks.append(task)
+            assigned = rng.sample(members, min(args.assignments, len(members)))
+            assignments += [
+                {"task_id": task_id, "user_id": user_id} for user_id in assigned
+            ]
+            score = 0
+            for number in range(args.updates):
+                score = min(100, score + rng.randint(1, 20))
+                update = {
+                    "id": len(updates) + 1,
+                    "task_id": task_id,
+                    "user_id": rng.choice(assigned) if assigned else 1,
+                    "date_updated": min(startdate + timedelta(days=number), today),
+                    "comment": f"Progress update {number + 1} on task {task_id}",
+                    "progress_score": score,
+                }
+                updates.append(update)
+                key = (task_id, update["date_updated"])
+                row = daily.setdefault(
+                    key,
+                    {
+                        "task_id": task_id,
+                        "project_id": project_id,
+                        "day": update["date_updated"],
+                        "updates": 0,
+                    },
+                )
+                row["updates"] += 1
+                row["progress_score"] = score
+                row["latest_progress_id"] = update["id"]
+                task["progress_score"] = score
+                task["latest_progress_id"] = update["id"]
+            project["task_progress_total"] += task["progress_score"]
+    tables = [
+        (Users, users),
+        (Projects, projects),
+        (Tasks, tasks),
+        (AssignUserTask, assignments),
+        (TaskProgressInfo, updates),
+        (TaskProgressDaily, list(daily.values())),
+    ]
+    with engine.begin() as connection:
+        for Model, rows in tables:
+            for batch in chunks(rows):
+                connection.execute(insert(Model), batch)
+        if connection.dialect.name == "postgresql":
+            for Model, _ in tables:
+                table = Model.__tablename__
+                connection.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                    )
+                )
+    engine.dispose()
+    return {Model.__tablename__: len(rows) for Model, rows in tables}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(environment: dict, port: int, workers: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env=environment,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("The API server exited during startup.")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The API server did not start within 60 seconds.")
+
+
+class Client:
+    def __init__(self, port: int, samples: dict | None):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+        self.samples = samples
+
+    def call(self, name, method, path, body=None, token=None, form=False):
+        headers = {}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if form:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            body = urllib.parse.urlencode(body)
+        elif body is not None:
+            headers["Content-Type"] = "application/json"
+            body = json.dumps(body)
+        start = time.perf_counter()
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        content = response.read()
+        elapsed = time.perf_counter() - start
+        if self.samples is not None:
+            match = QUERIES.search(response.getheader("Server-Timing") or "")
+            queries = int(match.group(1)) if match else None
+            self.samples[name].append((elapsed, response.status, queries))
+        if not content or "json" not in (response.getheader("Content-Type") or ""):
+            return response.status, None
+        return response.status, json.loads(content)
+
+    def close(self):
+        self.connection.close()
+
+
+def login(client: Client, email: str) -> str:
+    status, content = client.call(
+        "POST /auth/login",
+        "POST",
+        "/auth/login",
+        {"username": email, "password": PASSWORD},
+        form=True,
+    )
+    if status != 200:
+        raise RuntimeError(f"Could not log in as {email}: {status} {content}")
+    return content["access_token"]
+
+
+def dmy(day: date) -> str:
+    return day.strftime("%d-%m-%Y")
+
+
+class Workload:
+    def __init__(self, args, admin_token: str, member_token: str):
+        self.args = args
+        self.admin = admin_token
+        self.member = member_token
+        self.task_total = args.projects * args.tasks
+        self.operations = [
+            (10, self.list_projects),
+            (10, self.get_project),
+            (5, self.get_project_fields),
+            (3, self.project_timeseries),
+            (10, self.list_tasks),
+            (10, self.get_task),
+            (4, self.list_users),
+            (4, self.get_user),
+            (4, self.get_profile),
+            (6, self.get_my_tasks),
+            (3, self.search),
+            (3, self.deadlines),
+            (3, self.create_task),
+            (2, self.update_project),
+            (5, self.add_progress),
+            (2, self.edit_progress),
+            (3, self.assign_and_unassign),
+            (1, self.login),
+        ]
+
+    def project_id(self, rng) -> int:
+        return rng.randint(1, self.args.projects)
+
+    def task_id(self, rng) -> int:
+        return rng.randint(1, self.task_total)
+
+    def list_projects(self, client, rng, state):
+        client.call("GET /projects/", "GET", "/projects/?limit=20", token=self.admin)
+
+    def get_project(self, client, rng, state):
+        path = f"/projects/{self.project_id(rng)}"
+        client.call("GET /projects/{project_id}", "GET", path, token=self.admin)
+
+    def get_project_fields(self, client, rng, state):
+        path = f"/projects/{self.project_id(rng)}?fields=id,name,status"
+        client.call("GET /projects/{project_id}?fields", "GET", path, token=self.admin)
+
+    def project_timeseries(self, client, rng, state):
+        path = f"/projects/{self.project_id(rng)}/progress/timeseries?interval=week"
+        client.call(
+            "GET /projects/{project_id}/progress/timeseries",
+            "GET",
+            path,
+            token=self.admin,
+        )
+
+    def list_tasks(self, client, rng, state):
+        client.call("GET /tasks", "GET", "/tasks?limit=50", token=self.admin)
+
+    def get_task(self, client, rng, state):
+        path = f"/tasks/{self.task_id(rng)}"
+        client.call("GET /tasks/{task_id}", "GET", path, token=self.admin)
+
+    def list_users(self, client, rng, state):
+        client.call("GET /users/", "GET", "/users/?limit=50", token=self.admin)
+
+    def get_user(self, client, rng, state):
+        path = f"/users/{rng.randint(1, self.args.users)}"
+        client.call("GET /users/{user_id}", "GET", path, token=self.admin)
+
+    def get_profile(self, client, rng, state):
+        client.call("GET /users/profile", "GET", "/users/profile", token=self.member)
+
+    def get_my_tasks(self, client, rng, state):
+        client.call("GET /users/me/tasks", "GET", "/users/me/tasks", token=self.member)
+
+    def search(self, client, rng, state):
+        path = f"/search/?q=task+{self.task_id(rng)}&limit=20"
+        client.call("GET /search/", "GET", path, token=self.admin)
+
+    def deadlines(self, client, rng, state):
+        path = "/deadlines/tasks?window=due_soon&days=14&fields=id,name,enddate"
+        client.call("GET /deadlines/tasks", "GET", path, token=self.admin)
+
+    def create_task(self, client, rng, state):
+        today = date.today()
+        body = {
+            "name": f"Load test task {rng.randint(1, 10**9)}",
+            "description": "Created by benchmarks.load",
+            "status": "in progress",
+            "startdate": dmy(today),
+            "enddate": dmy(today + timedelta(days=rng.randint(1, 90))),
+        }
+        path = f"/projects/{self.project_id(rng)}/tasks"
+        client.call(
+            "POST /projects/{project_id}/tasks", "POST", path, body, token=self.admin
+        )
+
+    def update_project(self, client, rng, state):
+        project_id = self.project_id(rng)
+        body = {
+            "name": f"Benchmark project {project_id}",
+            "description": "Updated by benchmarks.load",
+            "status": rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+            "progress_score": rng.randint(0, 100),
+        }
+        client.call(
+            "PUT /projects/{project_id}",
+            "PUT",
+            f"/projects/{project_id}",
+            body,
+            token=self.admin,
+        )
+
+    def add_progress(self, client, rng, state):
+        task_id = self.task_id(rng)
+        body = {"comment": "Load test progress", "progress_score": rng.randint(0, 100)}
+        status, content = client.call(
+            "POST /updates/tasks/{task_id}",
+            "POST",
+            f"/updates/tasks/{task_id}",
+            body,
+            token=self.admin,
+        )
+        if status == 201:
+            state["progress"].append(content["task_progress_detail"][-1]["id"])
+
+    def edit_progress(self, client, rng, state):
+        if not state["progress"]:
+            return self.add_progress(client, rng, state)
+        progress_id = rng.choice(state["progress"])
+        body = {"comment": "Edited by load test", "progress_score": rng.randint(0, 100)}
+        client.call(
+            "PUT /updates/{progress_id}",
+            "PUT",
+            f"/updates/{progress_id}",
+            body,
+            token=self.admin,
+        )
+
+    def assign_and_unassign(self, client, rng, state):
+        path = f"/tasks/{self.task_id(rng)}/{state['user_id']}"
+        client.call("POST /tasks/{task_id}/{user_id}", "POST", path, token=self.admin)
+        client.call(
+            "DELETE /tasks/{task_id}/{user_id}", "DELETE", path, token=self.admin
+        )
+
+    def login(self, client, rng, state):
+        login(client, "bench-user2@example.com")
+
+    def run_client(self, number: int, port: int, samples: dict | None, count: int):
+        rng = random.Random(self.args.seed * 1000 + number)
+        weights = [weight for weight, _ in self.operations]
+        operations = [operation for _, operation in self.operations]
+        state = {"progress": [], "user_id": self.args.users + 1 + number}
+        client = Client(port, samples)
+        try:
+            for operation in rng.choices(operations, weights, k=count):
+                operation(client, rng, state)
+        finally:
+            client.close()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: dict, seconds: float) -> dict:
+    results = {}
+    for name, rows in sorted(samples.items()):
+        latencies = [elapsed * 1000 for elapsed, _, _ in rows]
+        queries = [count for _, _, count in rows if count is not None]
+        results[name] = {
+            "requests": len(rows),
+            "errors": sum(status >= 400 for _, status, _ in rows),
+            "throughput": round(len(rows) / seconds, 2),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "queries": round(statistics.mean(queries), 2) if queries else None,
+        }
+    return results
+
+
+def print_results(
+    results: dict, seconds: float, baseline: dict | None, tolerance: float
+) -> list:
+    total = sum(result["requests"] for result in results.values())
+    print(f"{total} requests in {seconds:.1f} s ({total / seconds:.1f} req/s)")
+    header = f"{'endpoint':<50} {'reqs':>6} {'err':>4} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}"
+    if baseline:
+        header += f" {'p95 vs base':>12} {'queries vs base':>16}"
+    print(header)
+    regressions = []
+    for name, result in results.items():
+        line = (
+            f"{name:<50} {result['requests']:>6} {result['errors']:>4} "
+            f"{result['throughput']:>7.1f} {result['p50_ms']:>8.1f} "
+            f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+            f"{result['queries'] if result['queries'] is not None else '-':>8}"
+        )
+        base = (baseline or {}).get(name)
+        if base:
+            change = result["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0
+            queries = (result["queries"] or 0) - (base["queries"] or 0)
+            line += f" {change:>+11.0%} {queries:>+16.1f}"
+            if change > tolerance or queries > 0.5:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Seed a database, start the API and drive every router with concurrent clients."
+    )
+    parser.add_argument(
+        "--db-url",
+        help="Empty database to use, e.g. postgresql://localhost/bench. Defaults to a temporary SQLite file.",
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=20, help="Tasks per project.")
+    parser.add_argument("--assignments", type=int, default=3, help="Users per task.")
+    parser.add_argument(
+        "--updates", type=int, default=5, help="Progress updates per task."
+    )
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Requests per client."
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed p95 increase over the baseline before an endpoint is flagged, as a fraction.",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        environment = dict(os.environ)
+        environment["DB_URL"] = args.db_url or f"sqlite:///{directory}/load.sqlite"
+        environment.setdefault("SECRET", "benchmark-secret")
+        environment.setdefault("ALGORITHM", "HS256")
+        environment["MIGRATE_ON_STARTUP"] = "false"
+        environment["METRICS_ENABLED"] = "true"
+        os.environ.update(environment)
+        subprocess.run(
+            [sys.executable, "-m", "app.migrate"], env=environment, check=True
+        )
+        counts = seed_database(args)
+        print(
+            "seeded " + ", ".join(f"{count} {table}" for table, count in counts.items())
+        )
+
+        port = free_port()
+        server = start_server(environment, port, args.workers)
+        try:
+            setup = Client(port, None)
+            workload = Workload(
+                args,
+                login(setup, "bench-admin@example.com"),
+                login(setup, "bench-user2@example.com"),
+            )
+            setup.close()
+            with ThreadPoolExecutor(args.clients) as pool:
+                list(
+                    pool.map(
+                        lambda number: workload.run_client(
+                            number, port, None, len(workload.operations)
+                        ),
+                        range(args.clients),
+                    )
+                )
+            samples = defaultdict(list)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(args.clients) as pool:
+                list(
+                    pool.map(
+                        lambda number: workload.run_client(
+                            number, port, samples, args.requests
+                        ),
+                        range(args.clients),
+                    )
+                )
+            seconds = time.perf_counter() - start
+        finally:
+            server.terminate()
+            server.wait()
+
+    results = summarize(samples, seconds)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["endpoints"]
+    regressions = print_results(results, seconds, baseline, args.tolerance)
+    if args.save_baseline:
+        settings = {
+            name: value
+            for name, value in vars(args).items()
+            if name not in ("db_url", "save_baseline", "compare", "tolerance")
+        }
+        with open(args.save_baseline, "w") as file:
+            json.dump({"settings": settings, "endpoints": results}, file, indent=2)
+            file.write("\n")
+    if regressions:
+        print(f"{len(regressions)} endpoints regressed against {args.compare}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
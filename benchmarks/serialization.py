@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import os
+import timeit
+from datetime import date, timedelta
+
+os.environ.setdefault("DB_URL", "sqlite://")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.orm import configure_mappers
+from app.models import AssignUserTask, Projects, TaskProgressInfo, Tasks, Users
+from app.schemas import ProjectOut
+from app.serializers import dump_json
+
+
+def build_projects(projects: int, tasks: int, users: int, updates: int) -> list:
+    configure_mappers()
+    today = date.today()
+    members = [
+        Users(
+            id=id,
+            firstname="User",
+            lastname=f"Number{id}",
+            email=f"user{id}@example.com",
+            password="",
+            role="user",
+        )
+        for id in range(1, users + 1)
+    ]
+    items = []
+    for project_id in range(1, projects + 1):
+        project = Projects(
+            id=project_id,
+            admin_id=1,
+            name=f"Project {project_id}",
+            description="Benchmark project",
+            date_created=today,
+            deadline=today + timedelta(days=90),
+            progress_score=0,
+            status="in progress",
+            task_count=tasks,
+            task_progress_total=0,
+        )
+        for task_number in range(tasks):
+            task_id = project_id * tasks + task_number
+            task = Tasks(
+                id=task_id,
+                project_id=project_id,
+                name=f"Task {task_id}",
+                description="Benchmark task",
+                status="in progress",
+                startdate=today,
+                enddate=today + timedelta(days=30),
+                progress_score=50,
+            )
+            for user in members:
+                assignment = AssignUserTask(task_id=task_id, user_id=user.id)
+                assignment.user = user
+                task.assigned_users.append(assignment)
+            for update_number in range(updates):
+                task.task_progress_detail.append(
+                    TaskProgressInfo(
+                        id=task_id * updates + update_number,
+                        task_id=task_id,
+                        user_id=1,
+                        date_updated=today,
+                        comment="Benchmark progress update",
+                        progress_score=50,
+                    )
+                )
+            project.project_tasks.append(task)
+        items.append(project)
+    return items
+
+
+async def response_model_path(field, items) -> bytes:
+    content = await serialize_response(field=field, response_content=items)
+    return JSONResponse(content).body
+
+
+def timed(function, repeat: int) -> tuple[float, int]:
+    size = len(function())
+    return min(timeit.Timer(function).repeat(repeat=repeat, number=1)), size
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare FastAPI's response_model serialization of list[ProjectOut] with app.serializers."
+    )
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--tasks", type=int, default=10)
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--updates", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    items = build_projects(args.projects, args.tasks, args.users, args.updates)
+    field = create_response_field(name="Response_projects", type_=list[ProjectOut])
+    loop = asyncio.new_event_loop()
+    paths = {
+        "response_model": lambda: loop.run_until_complete(
+            response_model_path(field, items)
+        ),
+        "type_adapter": lambda: dump_json(items, list[ProjectOut]),
+    }
+    print(
+        f"{args.projects} projects x {args.tasks} tasks "
+        f"({args.users} users, {args.updates} updates per task), best of {args.repeat}"
+    )
+    results = {name: timed(path, args.repeat) for name, path in paths.items()}
+    baseline = results["response_model"][0]
+    for name, (seconds, size) in results.items():
+        print(
+            f"{name:>15}: {seconds * 1000:9.1f} ms  {size / 1024:9.0f} KiB  "
+            f"{baseline / seconds:5.2f}x"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
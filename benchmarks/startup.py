@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PHASES = ["import", "startup", "first_request", "openapi"]
+
+
+def measure() -> dict:
+    start = time.perf_counter()
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    timings = {"import": time.perf_counter() - start}
+    start = time.perf_counter()
+    with TestClient(app) as client:
+        timings["startup"] = time.perf_counter() - start
+        start = time.perf_counter()
+        client.get("/", headers={"Accept-Encoding": "gzip"}).raise_for_status()
+        timings["first_request"] = time.perf_counter() - start
+        start = time.perf_counter()
+        client.get("/openapi.json").raise_for_status()
+        timings["openapi"] = time.perf_counter() - start
+    return timings
+
+
+def run_child(environment: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time importing app.main, the lifespan startup and the first requests in fresh processes."
+    )
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Run migrations at startup (MIGRATE_ON_STARTUP=true) instead of beforehand.",
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure()))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        environment = dict(os.environ)
+        environment.setdefault("DB_URL", f"sqlite:///{directory}/startup.sqlite")
+        environment["MIGRATE_ON_STARTUP"] = "true" if args.migrate else "false"
+        if not args.migrate:
+            subprocess.run(
+                [sys.executable, "-m", "app.migrate"], env=environment, check=True
+            )
+        results = [run_child(environment) for _ in range(args.runs)]
+
+    print(f"{args.runs} fresh processes, migrate on startup: {args.migrate}")
+    for phase in PHASES:
+        seconds = [result[phase] for result in results]
+        print(
+            f"{phase:>13}: median {statistics.median(seconds) * 1000:8.1f} ms  "
+            f"min {min(seconds) * 1000:8.1f} ms  max {max(seconds) * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()